@@ -0,0 +1,52 @@
+"""
+gunicorn settings for production; `gunicorn` picks this file up from the working directory.
+
+GUNICORN_WORKER_CLASS=sync (default) serves the WSGI app with 2 * cores + 1 worker
+processes, GUNICORN_WORKER_CLASS=uvicorn serves the ASGI app (and the native async
+views) with one uvicorn worker per core. GUNICORN_WORKERS / GUNICORN_THREADS override.
+"""
+import multiprocessing
+import os
+from pathlib import Path
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "travel_planner.settings_production")
+# Several workers must not rotate the same log file or keep separate metric counters.
+os.environ.setdefault("LOG_PER_PROCESS", "true")
+# The same directory settings_production gives management commands such as fetch_places.
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/travel_planner_metrics")
+
+cores = multiprocessing.cpu_count()
+
+if os.getenv("GUNICORN_WORKER_CLASS", "sync") == "uvicorn":
+    wsgi_app = "travel_planner.asgi:application"
+    worker_class = "uvicorn_worker.UvicornWorker"
+    workers = int(os.getenv("GUNICORN_WORKERS", cores))
+else:
+    wsgi_app = "travel_planner.wsgi:application"
+    threads = int(os.getenv("GUNICORN_THREADS", "1"))
+    worker_class = "gthread" if threads > 1 else "sync"
+    workers = int(os.getenv("GUNICORN_WORKERS", cores * 2 + 1))
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+timeout = 30
+graceful_timeout = 30
+keepalive = 5
+# Recycle workers now and then so a slow leak can't grow without bound.
+max_requests = 2000
+max_requests_jitter = 200
+errorlog = "-"
+
+
+def on_starting(server):
+    # Samples left by a previous run would be added to the new workers' counters.
+    # Only the sample files are removed, the directory itself may be shared or mounted.
+    directory = Path(os.environ["PROMETHEUS_MULTIPROC_DIR"])
+    directory.mkdir(parents=True, exist_ok=True)
+    for samples in directory.glob("*.db"):
+        samples.unlink(missing_ok=True)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
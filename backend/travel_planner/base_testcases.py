@@ -0,0 +1,56 @@
+import atexit
+import os
+import shutil
+import tempfile
+
+from django import test
+from django.core.cache import cache
+from django.test import override_settings
+from rest_framework.test import APIClient
+
+from user.models import User
+
+# Tests get a file cache of their own, so cache.clear() in setUp never wipes the cache of
+# a running dev server or flushes Redis. Each test process (see `manage.py test
+# --parallel`) uses its own directory below this one, so processes can't clear each other's.
+TEST_CACHE_ROOT = tempfile.mkdtemp(prefix="travel_planner_test_cache_")
+atexit.register(shutil.rmtree, TEST_CACHE_ROOT, True)
+
+
+def isolated_cache_dir():
+    """This process's test cache directory; pass it as CACHE_DIR to processes a test starts."""
+    return os.path.join(TEST_CACHE_ROOT, str(os.getpid()))
+
+
+class IsolatedCacheMixin:
+    @classmethod
+    def setUpClass(cls):
+        cls.enterClassContext(override_settings(CACHES={
+            "default": {
+                "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                "LOCATION": isolated_cache_dir(),
+            },
+        }))
+        super().setUpClass()
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+
+class TestCase(IsolatedCacheMixin, test.TestCase):
+    pass
+
+
+class TransactionTestCase(IsolatedCacheMixin, test.TransactionTestCase):
+    pass
+
+
+class APITestCase(TestCase):
+    """A TestCase with a `user` and a `client` authenticated as that user."""
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create(email="user@example.com")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
@@ -0,0 +1,148 @@
+import hashlib
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date, parse_etags, parse_http_date_safe
+from rest_framework import status
+from rest_framework.response import Response
+
+
+def _version_key(scope):
+    return f"response-version:{scope}"
+
+
+def _modified_key(scope):
+    return f"response-modified:{scope}"
+
+
+def get_cache_version(scope):
+    """
+    Return the version of the data behind `scope` and the time it last changed, starting
+    a new version if unknown. ETags are built from the version, Last-Modified from the time.
+    """
+    keys = [_version_key(scope), _modified_key(scope)]
+    values = cache.get_many(keys)
+    if len(values) < len(keys):
+        now = time.time()
+        cache.add(keys[0], _initial_version(now), None)
+        cache.add(keys[1], int(now), None)
+        values = cache.get_many(keys)
+    return values[keys[0]], values[keys[1]]
+
+
+def _initial_version(now):
+    # Counting from the current microsecond, so a cleared cache never starts over at a
+    # version an old ETag was made from.
+    return int(now * 1_000_000)
+
+
+def bump_cache_version(*scopes):
+    """Invalidate cached responses for `scopes` once the current transaction commits."""
+    def bump():
+        now = time.time()
+        for scope in scopes:
+            # add() and incr() are atomic, so concurrent commits never share a version.
+            cache.add(_version_key(scope), _initial_version(now), None)
+            cache.incr(_version_key(scope))
+            cache.set(_modified_key(scope), int(now), None)
+
+    transaction.on_commit(bump)
+
+
+def projects_scope(user_id):
+    return f"projects:{user_id}"
+
+
+def profile_scope(user_id):
+    return f"profile:{user_id}"
+
+
+PLACES_SCOPE = "places"
+
+
+class ConditionalResponseMixin:
+    """
+    Serves GET responses from the cache with ETag/Last-Modified validators.
+
+    Views return the scope their data belongs to from get_cache_scope(), or a tuple of
+    scopes when it combines several; writers call bump_cache_version() for that scope,
+    which changes the validators and retires the cached payloads. Clients presenting a
+    current validator get an empty 304.
+    """
+
+    def get_cache_scope(self):
+        raise NotImplementedError
+
+    def cached_response(self, request, render):
+        digest, modified, etag = _validators(request, self.get_cache_scope())
+
+        if _not_modified(request, etag, modified):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            key = f"response:{digest}"
+            data = cache.get(key)
+            if data is None:
+                response = render()
+                if response.status_code != status.HTTP_200_OK:
+                    return response
+                cache.set(key, response.data, settings.RESPONSE_CACHE_TIMEOUT)
+            else:
+                response = Response(data, status=status.HTTP_200_OK)
+
+        return _add_validators(response, etag, modified)
+
+
+async def cached_async_response(request, scope, render):
+    """
+    ConditionalResponseMixin.cached_response for the native async views: `render` is a
+    coroutine function returning an HttpResponse, whose body is cached when it is a 200.
+    """
+    digest, modified, etag = await sync_to_async(_validators)(request, scope)
+
+    if _not_modified(request, etag, modified):
+        response = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        key = f"async-response:{digest}"
+        cached = await cache.aget(key)
+        if cached is None:
+            response = await render()
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            await cache.aset(key, (response.content, response["Content-Type"]), settings.RESPONSE_CACHE_TIMEOUT)
+        else:
+            content, content_type = cached
+            response = HttpResponse(content, content_type=content_type)
+
+    return _add_validators(response, etag, modified)
+
+
+def _validators(request, scope):
+    scopes = (scope,) if isinstance(scope, str) else tuple(scope)
+    versions = [get_cache_version(scope) for scope in scopes]
+    user_id = getattr(request.user, "pk", None)
+    key = ":".join(f"{scope}@{version}" for scope, (version, _) in zip(scopes, versions))
+    digest = hashlib.sha1(f"{key}:{user_id}:{request.get_full_path()}".encode()).hexdigest()
+    # Last-Modified is the newest change in any of the scopes. It only has one-second
+    # resolution; clients sending If-None-Match are compared exactly.
+    return digest, max(modified for _, modified in versions), f'"{digest}"'
+
+
+def _not_modified(request, etag, modified):
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match is not None:
+        return etag in parse_etags(if_none_match) or if_none_match.strip() == "*"
+    if_modified_since = parse_http_date_safe(request.headers.get("If-Modified-Since", ""))
+    return if_modified_since is not None and modified <= if_modified_since
+
+
+def _add_validators(response, etag, modified):
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(modified)
+    response["Cache-Control"] = "private, no-cache"
+    patch_vary_headers(response, ["Authorization"])
+    return response
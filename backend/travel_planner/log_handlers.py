@@ -0,0 +1,136 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+from logging.handlers import QueueListener, RotatingFileHandler
+from pathlib import Path
+
+
+def get_handler(name):
+    # logging.getHandlerByName() only exists from Python 3.12.
+    if hasattr(logging, "getHandlerByName"):
+        return logging.getHandlerByName(name)
+    return logging._handlers.get(name)
+
+
+class Listener(QueueListener):
+    def enqueue_sentinel(self):
+        # The queue may be full at shutdown: wait for room instead of failing to stop.
+        self.queue.put(self._sentinel)
+
+
+class QueuedHandler(logging.Handler):
+    """
+    Puts records on an in-memory queue and returns; a background thread hands them to
+    the named handlers, so request threads never wait for the console or the disk.
+    dictConfig builds handlers in name order, so those must sort before this one.
+
+    The thread is started on the first record in each process, which keeps the handler
+    working in workers forked after the logging setup (gunicorn --preload). When the
+    queue is full, records are dropped and counted instead of blocking the caller.
+    """
+
+    def __init__(self, handlers, queue_size=10000):
+        super().__init__()
+        self.targets = []
+        for name in handlers:
+            handler = get_handler(name)
+            if handler is None:
+                raise ValueError(f"Handler {name!r} is not configured (names must sort before the queued handler)")
+            self.targets.append(handler)
+        self.queue_size = queue_size
+        self.queue = None
+        self.listener = None
+        self.pid = None
+        self.dropped = 0
+        self.start_lock = threading.Lock()
+
+    def start(self):
+        with self.start_lock:
+            if self.pid == os.getpid():
+                return
+            self.queue = queue.Queue(self.queue_size)
+            self.listener = Listener(self.queue, *self.targets, respect_handler_level=True)
+            self.listener.start()
+            self.pid = os.getpid()
+            atexit.register(self.stop)
+
+    def stop(self):
+        # Flushes whatever is still queued; called at exit and by logging.shutdown() via close().
+        if self.listener is not None and self.pid == os.getpid():
+            self.listener.stop()
+            self.listener = None
+            self.pid = None
+
+    def prepare(self, record):
+        # Render the message now: the arguments may change before the thread gets to them.
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def emit(self, record):
+        if self.pid != os.getpid():
+            self.start()
+        try:
+            self.queue.put_nowait(self.prepare(record))
+        except queue.Full:
+            self.dropped += 1
+        except Exception:
+            self.handleError(record)
+
+    def close(self):
+        self.stop()
+        super().close()
+
+
+class ProcessRotatingFileHandler(RotatingFileHandler):
+    """
+    RotatingFileHandler that can write one file per process (app.log -> app.<pid>.log),
+    so workers never rotate a file another worker is still writing to.
+    """
+
+    def __init__(self, filename, per_process=False, **kwargs):
+        self.template = Path(filename).resolve()
+        self.per_process = per_process
+        kwargs["delay"] = True
+        super().__init__(filename, **kwargs)
+
+    def process_filename(self):
+        if not self.per_process:
+            return os.fspath(self.template)
+        return os.fspath(self.template.with_name(f"{self.template.stem}.{os.getpid()}{self.template.suffix}"))
+
+    def emit(self, record):
+        filename = self.process_filename()
+        if filename != self.baseFilename:
+            if self.stream:
+                self.stream.close()
+                self.stream = None
+            self.baseFilename = filename
+        super().emit(record)
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, for log shippers."""
+
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "file": record.filename,
+            "line": record.lineno,
+            "process": record.process,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry)
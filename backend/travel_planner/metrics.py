@@ -0,0 +1,131 @@
+import os
+from functools import lru_cache
+from hmac import compare_digest
+from ipaddress import ip_address, ip_network
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.http import Http404, HttpResponse
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+# With PROMETHEUS_MULTIPROC_DIR set (it must be set before the workers start, see the
+# README) every process writes its samples to files in that directory and the metrics
+# view aggregates all of them, so any gunicorn/uvicorn worker can answer a scrape.
+MULTIPROCESS = bool(os.getenv("PROMETHEUS_MULTIPROC_DIR"))
+
+REQUEST_LATENCY = Histogram(
+    "travel_planner_request_duration_seconds",
+    "Time spent serving a request, by route",
+    ["method", "route"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+REQUESTS = Counter(
+    "travel_planner_requests",
+    "Requests served, by route and response status",
+    ["method", "route", "status"],
+)
+REQUEST_QUERIES = Histogram(
+    "travel_planner_request_db_queries",
+    "Database queries run while serving a request, by route",
+    ["route"],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100),
+)
+REQUEST_DB_LATENCY = Histogram(
+    "travel_planner_request_db_duration_seconds",
+    "Time spent in the database while serving a request, by route",
+    ["route"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5),
+)
+# Compared with the request counter this shows how often persistent connections
+# (CONN_MAX_AGE) are actually reused instead of opened per request.
+DB_CONNECTIONS = Counter(
+    "travel_planner_db_connections_opened",
+    "New database connections opened, by database alias",
+    ["alias"],
+)
+
+IMPORT_PAGES = Counter(
+    "travel_planner_import_pages",
+    "Pages (or local batches) imported by fetch_places",
+    ["source"],
+)
+IMPORT_PLACES = Counter(
+    "travel_planner_import_places",
+    "Places written by fetch_places",
+    ["source"],
+)
+IMPORT_LAST_PAGE = Gauge(
+    "travel_planner_import_last_page",
+    "Last page fully imported by the running concurrent fetch_places",
+    multiprocess_mode="mostrecent",
+)
+IMPORT_TOTAL_PAGES = Gauge(
+    "travel_planner_import_total_pages",
+    "Number of pages the running concurrent fetch_places is importing",
+    multiprocess_mode="mostrecent",
+)
+
+
+def route_name(request):
+    # The URL pattern name, not the path, keeps one series per route whatever the ids.
+    match = request.resolver_match
+    if match is None:
+        return "<unmatched>"
+    return match.view_name or match._func_path
+
+
+def observe_request(request, response, total_ms, recorder):
+    route = route_name(request)
+    REQUEST_LATENCY.labels(request.method, route).observe(total_ms / 1000)
+    REQUESTS.labels(request.method, route, str(response.status_code)).inc()
+    REQUEST_QUERIES.labels(route).observe(len(recorder.queries))
+    REQUEST_DB_LATENCY.labels(route).observe(recorder.db_ms / 1000)
+
+
+@receiver(connection_created)
+def count_connection(sender, connection, **kwargs):
+    DB_CONNECTIONS.labels(connection.alias).inc()
+
+
+@lru_cache
+def _allowed_networks(allowed_ips):
+    return tuple(ip_network(entry.strip(), strict=False) for entry in allowed_ips if entry.strip())
+
+
+def may_scrape(request):
+    """
+    Scrapes must carry METRICS_TOKEN as a bearer token or come from an address in
+    METRICS_ALLOWED_IPS. Only REMOTE_ADDR counts, X-Forwarded-For can be forged.
+    """
+    if settings.METRICS_TOKEN:
+        scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+        if scheme.lower() == "bearer" and compare_digest(token.encode(), settings.METRICS_TOKEN.encode()):
+            return True
+    try:
+        address = ip_address(request.META.get("REMOTE_ADDR", ""))
+    except ValueError:
+        return False
+    return any(address in network for network in _allowed_networks(tuple(settings.METRICS_ALLOWED_IPS)))
+
+
+def metrics_view(request):
+    """Metrics of this process, or of every worker in multiprocess mode, in the Prometheus text format."""
+    if not may_scrape(request):
+        # Not found rather than forbidden, so the endpoint isn't advertised to the public.
+        raise Http404
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return HttpResponse(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
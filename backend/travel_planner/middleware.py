@@ -0,0 +1,145 @@
+import json
+import logging
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from .metrics import observe_request
+
+SLOW_REQUEST_LOGGER = logging.getLogger("travel_planner.slow_requests")
+
+# The recorder of the request being served. Context variables follow the request into
+# the threads async views run ORM calls in, where each thread has its own connection.
+current_recorder = ContextVar("current_recorder", default=None)
+
+
+class QueryRecorder:
+    """Database execute wrapper collecting the SQL and duration of every query."""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((sql, (time.perf_counter() - started) * 1000))
+
+    @property
+    def db_ms(self):
+        return sum(duration for _, duration in self.queries)
+
+    def summary(self):
+        """Distinct statements with how often they ran and their total time, most expensive first."""
+        grouped = {}
+        for sql, duration in self.queries:
+            entry = grouped.setdefault(sql, {"sql": sql, "count": 0, "ms": 0.0})
+            entry["count"] += 1
+            entry["ms"] += duration
+        for entry in grouped.values():
+            entry["ms"] = round(entry["ms"], 2)
+        return sorted(grouped.values(), key=lambda entry: entry["ms"], reverse=True)
+
+    @property
+    def duplicates(self):
+        # Same SQL with different parameters counts too: that is what an N+1 looks like.
+        return sum(count - 1 for count in Counter(sql for sql, _ in self.queries).values())
+
+
+def record_query(execute, sql, params, many, context):
+    recorder = current_recorder.get()
+    if recorder is None:
+        return execute(sql, params, many, context)
+    return recorder(execute, sql, params, many, context)
+
+
+def install_query_recorder(connection):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+@receiver(connection_created)
+def install_query_recorder_on_connect(sender, connection, **kwargs):
+    install_query_recorder(connection)
+
+
+class RequestMetricsMiddleware:
+    """
+    Measures every request: total time, time spent in the database, query count and
+    repeated queries. The numbers go out as a Server-Timing header and to the Prometheus
+    metrics, and requests over the SLOW_REQUEST_* thresholds are written to the slow
+    request log with their SQL.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        recorder, token, started = self.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            current_recorder.reset(token)
+        return self.finish(request, response, recorder, started)
+
+    async def __acall__(self, request):
+        recorder, token, started = self.start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_recorder.reset(token)
+        return self.finish(request, response, recorder, started)
+
+    def start(self):
+        # Connections opened before this module was imported missed connection_created.
+        for connection in connections.all(initialized_only=True):
+            install_query_recorder(connection)
+        recorder = QueryRecorder()
+        return recorder, current_recorder.set(recorder), time.perf_counter()
+
+    def finish(self, request, response, recorder, started):
+        total_ms = (time.perf_counter() - started) * 1000
+        db_ms = recorder.db_ms
+        duplicates = recorder.duplicates
+        observe_request(request, response, total_ms, recorder)
+
+        if settings.SERVER_TIMING:
+            response["Server-Timing"] = (
+                f'total;dur={total_ms:.1f}, '
+                f'db;dur={db_ms:.1f};desc="{len(recorder.queries)} queries, {duplicates} duplicates"'
+            )
+
+        if (
+            total_ms >= settings.SLOW_REQUEST_MS
+            or len(recorder.queries) >= settings.SLOW_REQUEST_QUERIES
+            or duplicates >= settings.SLOW_REQUEST_DUPLICATE_QUERIES
+        ):
+            match = request.resolver_match
+            SLOW_REQUEST_LOGGER.warning(json.dumps({
+                "method": request.method,
+                "path": request.path,
+                "view": match.view_name if match else None,
+                "status": response.status_code,
+                "total_ms": round(total_ms, 2),
+                "db_ms": round(db_ms, 2),
+                "queries": len(recorder.queries),
+                "duplicates": duplicates,
+                "sql": recorder.summary(),
+            }))
+
+        return response
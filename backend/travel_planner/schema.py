@@ -0,0 +1,81 @@
+import hashlib
+import threading
+from functools import cache
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
+from drf_yasg import openapi
+from drf_yasg.views import get_schema_view
+from rest_framework import permissions
+
+SCHEMA_INFO = openapi.Info(
+    title="Travel Planner API",
+    default_version="v1",
+    description="API for managing travel projects",
+)
+
+SchemaView = get_schema_view(
+    SCHEMA_INFO,
+    public=True,
+    permission_classes=[permissions.AllowAny],
+    authentication_classes=[],
+)
+
+SPEC_RENDERERS = {renderer.format.lstrip("."): renderer for renderer in SchemaView.renderer_classes}
+
+# "openapi" and "json" are both the JSON document.
+SCHEMA_FILES = {"openapi": "schema.json", "json": "schema.json", "yaml": "schema.yaml"}
+
+_rendered = {}
+_lock = threading.Lock()
+
+
+@cache
+def generate_schema():
+    # Without a request the document carries no host, so Swagger UI and clients use
+    # whichever host they fetched it from and one document serves every host.
+    generator = SchemaView.generator_class(SCHEMA_INFO)
+    return generator.get_schema(request=None, public=True)
+
+
+def render_schema(fmt):
+    return SPEC_RENDERERS[fmt]().render(generate_schema())
+
+
+def get_rendered_schema(fmt):
+    """
+    Return (content, etag) for the document in `fmt`. The document comes from
+    OPENAPI_SCHEMA_DIR when generate_openapi_schema wrote it there at deploy time, and
+    is generated on first use otherwise; either way it is built once per process.
+    """
+    if fmt not in _rendered:
+        with _lock:
+            if fmt not in _rendered:
+                path = settings.OPENAPI_SCHEMA_DIR / SCHEMA_FILES[fmt]
+                content = path.read_bytes() if path.exists() else render_schema(fmt)
+                _rendered[fmt] = content, f'"{hashlib.sha1(content).hexdigest()}"'
+    return _rendered[fmt]
+
+
+class CachedSchemaView(SchemaView):
+    """
+    Schema view serving the JSON/YAML document from memory with an ETag instead of
+    walking every view on each request. The Swagger UI and ReDoc pages load the
+    document through ?format=openapi, so they are served from it as well.
+    """
+
+    def get(self, request, version="", format=None):
+        fmt = request.accepted_renderer.format.lstrip(".")
+        if fmt not in SPEC_RENDERERS:
+            return super().get(request, version, format)
+
+        content, etag = get_rendered_schema(fmt)
+        if etag in parse_etags(request.headers.get("If-None-Match", "")):
+            response = HttpResponse(status=304)
+        else:
+            response = HttpResponse(content, content_type=request.accepted_renderer.media_type)
+        response["ETag"] = etag
+        patch_cache_control(response, public=True, no_cache=True)
+        return response
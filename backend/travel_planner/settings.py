@@ -43,6 +43,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "rest_framework",
     "drf_yasg",
 
@@ -51,6 +52,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "travel_planner.middleware.RequestMetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -62,13 +64,87 @@ MIDDLEWARE = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
-    )
+        'user.authentication.CachedJWTAuthentication',
+    ),
+    # Attempts per address across all logins, e.g. "30/min"; unset means no cap.
+    'DEFAULT_THROTTLE_RATES': {
+        'login': os.getenv("LOGIN_RATE"),
+    },
+    # Proxies in front of the app; throttles take the client address they appended to
+    # X-Forwarded-For. 0 uses REMOTE_ADDR, so a client can't pick its own address.
+    'NUM_PROXIES': int(os.getenv("NUM_PROXIES", "0")),
+}
+
+# Failed logins are counted in the cache; once an address or an account reaches its
+# limit, further attempts are rejected without hashing until the window passes.
+LOGIN_FAILURES_PER_ACCOUNT = int(os.getenv("LOGIN_FAILURES_PER_ACCOUNT", "5"))
+LOGIN_FAILURES_PER_IP = int(os.getenv("LOGIN_FAILURES_PER_IP", "20"))
+LOGIN_FAILURE_WINDOW = int(os.getenv("LOGIN_FAILURE_WINDOW", "900"))
+
+# Seconds an authenticated user stays cached; entries are dropped when the user is saved.
+AUTH_USER_CACHE_TIMEOUT = 60
+
+# Build request.user from the token claims without touching the database.
+JWT_STATELESS_AUTH = os.getenv("JWT_STATELESS_AUTH", "false").lower() == "true"
+
+# Cache versions, cached users and login counters must be shared by every process,
+# including management commands such as fetch_places. Without REDIS_URL a file cache
+# under CACHE_DIR does that for a single machine (runserver, tests); with several
+# workers or hosts use Redis.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.getenv("CACHE_DIR", BASE_DIR / ".django_cache"),
+    }
 }
+if os.getenv("REDIS_URL"):
+    CACHES["default"] = {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.getenv("REDIS_URL"),
+    }
+
+# Seconds a rendered read response is kept; writes invalidate it earlier (see travel_planner.caching).
+RESPONSE_CACHE_TIMEOUT = 300
+
+# Written by `manage.py generate_openapi_schema` at deploy time; without it the schema
+# is generated on the first request of every process.
+OPENAPI_SCHEMA_DIR = Path(os.getenv("OPENAPI_SCHEMA_DIR", BASE_DIR / "openapi_schema"))
+
+# Requests reaching any of these go to logs/slow_requests.log together with their SQL.
+SLOW_REQUEST_MS = int(os.getenv("SLOW_REQUEST_MS", "500"))
+SLOW_REQUEST_QUERIES = int(os.getenv("SLOW_REQUEST_QUERIES", "30"))
+SLOW_REQUEST_DUPLICATE_QUERIES = int(os.getenv("SLOW_REQUEST_DUPLICATE_QUERIES", "5"))
+
+# /metrics/ answers scrapes carrying this bearer token or coming from these addresses
+# (comma separated, CIDR ranges allowed); everyone else gets a 404.
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+METRICS_ALLOWED_IPS = os.getenv("METRICS_ALLOWED_IPS", "127.0.0.1,::1").split(",")
+
+# Send per-request total/db timings to clients in a Server-Timing header. They tell
+# anyone how much database work a request costs, so only on by default with DEBUG.
+SERVER_TIMING = os.getenv("SERVER_TIMING", str(DEBUG)).lower() == "true"
 
 LOG_DIR = BASE_DIR / "logs"
 LOG_DIR.mkdir(exist_ok=True)
 
+# LOG_FORMAT=json writes one JSON object per line to the console and log files instead of plain text.
+LOG_FORMATTER = "json" if os.getenv("LOG_FORMAT") == "json" else "verbose"
+# Log files rotate at LOG_MAX_BYTES keeping LOG_BACKUP_COUNT old files. With several workers
+# set LOG_PER_PROCESS so each one writes (and rotates) its own app.<pid>.log.
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", "5"))
+LOG_PER_PROCESS = os.getenv("LOG_PER_PROCESS", "false").lower() == "true"
+
+LOG_FILE_HANDLER = {
+    "class": "travel_planner.log_handlers.ProcessRotatingFileHandler",
+    "maxBytes": LOG_MAX_BYTES,
+    "backupCount": LOG_BACKUP_COUNT,
+    "per_process": LOG_PER_PROCESS,
+    "encoding": "utf-8",
+}
+
+# Loggers only talk to the "threaded*" handlers, which return immediately; the console and
+# file handlers run on a background thread (see travel_planner.log_handlers).
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
@@ -76,36 +152,66 @@ LOGGING = {
         "verbose": {
             "format": "{name} {levelname} {asctime} {filename} {message}",
             "style": "{"
-        }
+        },
+        "message": {
+            "format": "{message}",
+            "style": "{"
+        },
+        "json": {
+            "()": "travel_planner.log_handlers.JsonFormatter",
+        },
     },
     "handlers": {
         "console": {
             "class": "logging.StreamHandler",
-            "formatter": "verbose"
+            "formatter": LOG_FORMATTER
         },
         "file": {
+            **LOG_FILE_HANDLER,
             "level": "INFO",
-            "class": "logging.FileHandler",
-            "formatter": "verbose",
+            "formatter": LOG_FORMATTER,
             "filename": str(LOG_DIR / "app.log")
         },
         "error_file": {
+            **LOG_FILE_HANDLER,
             "level": "ERROR",
-            "class": "logging.FileHandler",
-            "formatter": "verbose",
+            "formatter": LOG_FORMATTER,
             "filename": str(LOG_DIR / "error.log")
-        }
+        },
+        "slow_requests_file": {
+            **LOG_FILE_HANDLER,
+            "level": "WARNING",
+            "formatter": "message",
+            "filename": str(LOG_DIR / "slow_requests.log")
+        },
+        "threaded": {
+            "()": "travel_planner.log_handlers.QueuedHandler",
+            "handlers": ["console", "file", "error_file"],
+        },
+        "threaded_django": {
+            "()": "travel_planner.log_handlers.QueuedHandler",
+            "handlers": ["console", "error_file"],
+        },
+        "threaded_slow_requests": {
+            "()": "travel_planner.log_handlers.QueuedHandler",
+            "handlers": ["slow_requests_file"],
+        },
     },
     "root": {
-        "handlers": ["console", "file", "error_file"],
+        "handlers": ["threaded"],
         "level": "INFO",
     },
     "loggers": {
         "django": {
-            "handlers": ["console", "error_file"],
+            "handlers": ["threaded_django"],
             "level": "INFO",
             "propagate": False,
         },
+        "travel_planner.slow_requests": {
+            "handlers": ["threaded_slow_requests"],
+            "level": "WARNING",
+            "propagate": False,
+        },
     },
 }
 
@@ -155,6 +261,23 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# PASSWORD_HASHER picks the hasher for new passwords ("pbkdf2" or "argon2"); the other one
+# stays listed so existing hashes verify and are rehashed on the next login. Unset cost
+# parameters fall back to Django's defaults.
+PASSWORD_HASHER = os.getenv("PASSWORD_HASHER", "pbkdf2")
+_PASSWORD_HASHERS = {
+    "pbkdf2": "user.hashers.PBKDF2PasswordHasher",
+    "argon2": "user.hashers.Argon2PasswordHasher",
+}
+PASSWORD_HASHERS = [
+    _PASSWORD_HASHERS[PASSWORD_HASHER],
+    *(hasher for name, hasher in _PASSWORD_HASHERS.items() if name != PASSWORD_HASHER),
+]
+PASSWORD_PBKDF2_ITERATIONS = int(os.getenv("PASSWORD_PBKDF2_ITERATIONS", "0")) or None
+ARGON2_TIME_COST = int(os.getenv("ARGON2_TIME_COST", "0")) or None
+ARGON2_MEMORY_COST = int(os.getenv("ARGON2_MEMORY_COST", "0")) or None
+ARGON2_PARALLELISM = int(os.getenv("ARGON2_PARALLELISM", "0")) or None
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
@@ -0,0 +1,65 @@
+"""
+Production settings: DEBUG off, static files served by WhiteNoise and a psycopg
+connection pool per worker. Run under gunicorn (see gunicorn.conf.py) with
+DJANGO_SETTINGS_MODULE=travel_planner.settings_production.
+"""
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+from psycopg_pool import ConnectionPool
+
+from .settings import *  # noqa: F401,F403
+from .settings import BASE_DIR, DATABASES, MIDDLEWARE
+
+DEBUG = False
+
+# fetch_places and other management commands run in processes of their own; their
+# metrics only reach /metrics/ through the multiprocess directory the workers share.
+# Set here, before travel_planner.metrics imports prometheus_client, so that every
+# process using these settings writes there, and kept in step with gunicorn.conf.py.
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/travel_planner_metrics")
+os.makedirs(os.environ["PROMETHEUS_MULTIPROC_DIR"], exist_ok=True)
+SERVER_TIMING = os.getenv("SERVER_TIMING", "false").lower() == "true"
+
+# Response cache versions, the place catalogue version and login throttling are shared
+# between workers through the cache; the file-based default only works on one host.
+if not os.getenv("REDIS_URL"):
+    raise ImproperlyConfigured("Set REDIS_URL: production workers share their cache through Redis.")
+
+ALLOWED_HOSTS = [host for host in os.getenv("ALLOWED_HOSTS", "").split(",") if host]
+CSRF_TRUSTED_ORIGINS = [origin for origin in os.getenv("CSRF_TRUSTED_ORIGINS", "").split(",") if origin]
+
+# TLS is terminated by the proxy in front of gunicorn.
+SECURE_PROXY_SSL_HEADER = ("HTTP_X_FORWARDED_PROTO", "https")
+SESSION_COOKIE_SECURE = True
+CSRF_COOKIE_SECURE = True
+
+# Swagger/redoc/admin assets are collected into STATIC_ROOT at deploy time
+# (manage.py collectstatic) and served compressed with far-future cache headers.
+STATIC_ROOT = BASE_DIR / "staticfiles"
+STORAGES = {
+    "default": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+    },
+    "staticfiles": {
+        "BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage",
+    },
+}
+MIDDLEWARE = [*MIDDLEWARE]
+MIDDLEWARE.insert(
+    MIDDLEWARE.index("django.middleware.security.SecurityMiddleware") + 1,
+    "whitenoise.middleware.WhiteNoiseMiddleware",
+)
+
+# Every worker keeps a small pool of PostgreSQL connections; connections are checked
+# before they are handed out, so ones the server dropped are replaced transparently.
+# Pooling replaces persistent connections, which is why CONN_MAX_AGE goes back to 0.
+if DATABASES["default"]["ENGINE"] == "django.db.backends.postgresql":
+    DATABASES["default"]["CONN_MAX_AGE"] = 0
+    DATABASES["default"].setdefault("OPTIONS", {})["pool"] = {
+        "min_size": int(os.getenv("DB_POOL_MIN_SIZE", "2")),
+        "max_size": int(os.getenv("DB_POOL_MAX_SIZE", "8")),
+        "timeout": float(os.getenv("DB_POOL_TIMEOUT", "10")),
+        "max_idle": float(os.getenv("DB_POOL_MAX_IDLE", "300")),
+        "check": ConnectionPool.check_connection,
+    }
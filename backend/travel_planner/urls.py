@@ -16,27 +16,17 @@ Including another URLconf
 """
 
 from django.contrib import admin
-from django.urls import path, include
-from rest_framework import permissions
-from drf_yasg.views import get_schema_view
-from drf_yasg import openapi
+from django.urls import path, include, re_path
 
-schema_view = get_schema_view(
-   openapi.Info(
-      title="Travel Planner API",
-      default_version='v1',
-      description="API for managing travel projects",
-   ),
-   public=True,
-   permission_classes=[permissions.AllowAny],
-   authentication_classes=[],
-)
+from .metrics import metrics_view
+from .schema import CachedSchemaView
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("travel/", include("travel_projects.urls")),   
     path("user/", include("user.urls")),
-    path('swagger(<format>\.json|\.yaml)', schema_view.without_ui(cache_timeout=0), name='schema-json'),
-    path('swagger/', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
-    path('redoc/', schema_view.with_ui('redoc', cache_timeout=0), name='schema-redoc'), 
+    path("metrics/", metrics_view, name="metrics"),
+    re_path(r'^swagger(?P<format>\.json|\.yaml)$', CachedSchemaView.without_ui(), name='schema-json'),
+    path('swagger/', CachedSchemaView.with_ui('swagger'), name='schema-swagger-ui'),
+    path('redoc/', CachedSchemaView.with_ui('redoc'), name='schema-redoc'), 
 ]
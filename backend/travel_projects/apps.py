@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class TravelProjectsConfig(AppConfig):
     name = 'travel_projects'
+
+    def ready(self):
+        from . import signals  # noqa: F401
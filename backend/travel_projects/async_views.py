@@ -0,0 +1,101 @@
+from functools import partial
+from types import SimpleNamespace
+
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor
+
+from travel_planner.caching import PLACES_SCOPE, cached_async_response, projects_scope
+from user.authentication import async_jwt_required
+
+from .models import Place, TravelProject
+from .pagination import PlaceCursorPagination
+from .serializers import PlaceSerializer, TravelProjectSerializer, TravelProjectSummarySerializer, wants_summary
+
+# Native async counterparts of the hot read endpoints. They await the ORM instead of
+# holding a worker thread, so an ASGI server can keep many slow clients in flight.
+# Serializers only see prefetched rows and never touch the database themselves.
+# Responses go through the same versioned cache as the sync views, so comparing the
+# two measures sync against async rather than cached against uncached.
+
+
+def _projects(request):
+    return TravelProject.objects.filter(user_id=request.user.pk).prefetch_related("travelprojectplace_set")
+
+
+@require_GET
+@async_jwt_required
+async def travel_project_list(request):
+    return await cached_async_response(request, projects_scope(request.user.pk), partial(_project_list, request))
+
+
+async def _project_list(request):
+    if wants_summary(request.GET):
+        projects = [project async for project in TravelProject.objects.filter(user_id=request.user.pk)]
+        return JsonResponse(TravelProjectSummarySerializer(projects, many=True).data, safe=False)
+    projects = [project async for project in _projects(request)]
+    return JsonResponse(TravelProjectSerializer(projects, many=True).data, safe=False)
+
+
+@require_GET
+@async_jwt_required
+async def travel_project_detail(request, pk):
+    return await cached_async_response(request, projects_scope(request.user.pk), partial(_project_detail, request, pk))
+
+
+async def _project_detail(request, pk):
+    try:
+        project = await _projects(request).aget(pk=pk)
+    except TravelProject.DoesNotExist:
+        return JsonResponse({"detail": "No TravelProject matches the given query."}, status=404)
+    return JsonResponse(TravelProjectSerializer(project).data)
+
+
+@require_GET
+@async_jwt_required
+async def place_list(request):
+    """Keyset pages over Place.id, with the cursors and response shape of PlaceCursorPagination."""
+    return await cached_async_response(request, PLACES_SCOPE, partial(_place_page, request))
+
+
+async def _place_page(request):
+    pagination = PlaceCursorPagination()
+    pagination.base_url = request.build_absolute_uri()
+    try:
+        page_size = int(request.GET.get(pagination.page_size_query_param, pagination.page_size))
+    except ValueError:
+        page_size = pagination.page_size
+    page_size = max(min(page_size, pagination.max_page_size), 1)
+
+    try:
+        # decode_cursor only reads query_params, which a plain HttpRequest calls GET.
+        cursor = pagination.decode_cursor(SimpleNamespace(query_params=request.GET))
+        position = int(cursor.position) if cursor and cursor.position is not None else None
+    except (NotFound, ValueError):
+        return JsonResponse({"detail": pagination.invalid_cursor_message}, status=404)
+    offset, reverse = (cursor.offset, cursor.reverse) if cursor else (0, False)
+
+    places = Place.objects.order_by("id")
+    if position is not None:
+        places = places.filter(id__lt=position).order_by("-id") if reverse else places.filter(id__gt=position)
+
+    page = [place async for place in places[offset:offset + page_size + 1]]
+    has_more = len(page) > page_size
+    page = page[:page_size]
+    if reverse:
+        page.reverse()
+
+    has_next = has_more if not reverse else position is not None
+    has_previous = has_more if reverse else position is not None
+    next_url = previous_url = None
+    if page and has_next:
+        next_url = pagination.encode_cursor(Cursor(offset=0, reverse=False, position=str(page[-1].id)))
+    if page and has_previous:
+        previous_url = pagination.encode_cursor(Cursor(offset=0, reverse=True, position=str(page[0].id)))
+
+    return JsonResponse({
+        "next": next_url,
+        "previous": previous_url,
+        "results": PlaceSerializer(page, many=True).data,
+    })
@@ -0,0 +1,72 @@
+import threading
+from array import array
+from bisect import bisect_left
+from uuid import uuid4
+
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import Place
+
+# Places only change when fetch_places runs (or through the admin), so every process
+# keeps the ids of the whole catalogue in memory and reloads them when the version in
+# the shared cache changes. A random token rather than a timestamp, so that a cleared
+# or restarted cache can never hand out a version an old snapshot already carries.
+VERSION_KEY = "place-catalogue-version"
+
+_catalogue = None
+_lock = threading.Lock()
+
+
+class PlaceCatalogue:
+    """Sorted Place ids, 8 bytes each, searched by bisection."""
+
+    def __init__(self, version, ids):
+        self.version = version
+        self.ids = array("q", ids)
+
+    def __contains__(self, place_id):
+        index = bisect_left(self.ids, place_id)
+        return index < len(self.ids) and self.ids[index] == place_id
+
+    def __len__(self):
+        return len(self.ids)
+
+
+def get_catalogue_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, uuid4().hex, None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def bump_catalogue_version():
+    """Make every process reload the catalogue once the current transaction commits."""
+    transaction.on_commit(lambda: cache.set(VERSION_KEY, uuid4().hex, None))
+
+
+def get_catalogue():
+    global _catalogue
+    version = get_catalogue_version()
+    catalogue = _catalogue
+    if catalogue is None or catalogue.version != version:
+        with _lock:
+            if _catalogue is None or _catalogue.version != version:
+                ids = Place.objects.order_by("id").values_list("id", flat=True)
+                _catalogue = PlaceCatalogue(version, ids.iterator(chunk_size=10_000))
+            catalogue = _catalogue
+    return catalogue
+
+
+def missing_place_ids(place_ids):
+    """
+    Return the ids in `place_ids` that have no Place. Ids in the catalogue cost no
+    query; the rest are looked up in one query, since a place created after the
+    snapshot was loaded isn't in it yet.
+    """
+    catalogue = get_catalogue()
+    unknown = {place_id for place_id in place_ids if place_id not in catalogue}
+    if unknown:
+        unknown -= set(Place.objects.filter(id__in=unknown).values_list("id", flat=True))
+    return unknown
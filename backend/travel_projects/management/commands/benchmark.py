@@ -0,0 +1,266 @@
+import json
+import platform
+import statistics
+import subprocess
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timezone
+
+import django
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings, setup_test_environment, teardown_test_environment
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from user.models import User
+
+from ...models import TravelProject, TravelProjectPlace
+from .seed_benchmark_data import BENCHMARK_PASSWORD
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a benchmark dataset and measure latency percentiles, query counts and allocations "
+        "for every travel_projects and user endpoint; results are written as JSON"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=50)
+        parser.add_argument("--projects", type=int, default=20, help="Projects per user")
+        parser.add_argument("--places-per-project", type=int, default=10)
+        parser.add_argument("--catalogue", type=int, default=100_000, help="Number of Place rows")
+        parser.add_argument("--iterations", type=int, default=50, help="Timed requests per endpoint")
+        parser.add_argument("--alloc-iterations", type=int, default=5, help="Extra requests traced for allocations")
+        parser.add_argument("--endpoints", nargs="*", help="Only run endpoints whose name contains one of these")
+        parser.add_argument(
+            "--warm",
+            action="store_true",
+            help="Keep cached users and responses between requests instead of measuring the uncached path",
+        )
+        parser.add_argument("--output", help="Write the JSON results to this file")
+        parser.add_argument("--compare", help="Print the change against a previous results file")
+        parser.add_argument(
+            "--keepdb",
+            action="store_true",
+            help="Keep the benchmark database (and its seeded data) for the next run",
+        )
+        parser.add_argument(
+            "--in-place",
+            action="store_true",
+            help="Use the configured database as is instead of a separate test database",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            setup_test_environment()
+            teardown = True
+        except RuntimeError:
+            # Already running inside the test runner.
+            teardown = False
+
+        old_name = connection.settings_dict["NAME"]
+        if not options["in_place"]:
+            connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=options["keepdb"], serialize=False)
+
+        try:
+            dataset = {key: options[key] for key in ("users", "projects", "places_per_project", "catalogue")}
+            if not User.objects.filter(email="bench0@example.com").exists():
+                self.stdout.write("Seeding benchmark data...")
+                call_command("seed_benchmark_data", stdout=self.stdout, **dataset)
+
+            # A private in-process cache: clearing it between requests must not reset the
+            # shared cache (Redis in production) with everyone's responses and login counters.
+            with override_settings(CACHES={"default": {
+                "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+                "LOCATION": "benchmark",
+            }}):
+                results = self.run_endpoints(options)
+        finally:
+            if not options["in_place"]:
+                connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=options["keepdb"])
+            if teardown:
+                teardown_test_environment()
+
+        report = {"meta": self.meta(dataset, options), "results": results}
+        if options["output"]:
+            with open(options["output"], "w") as fp:
+                json.dump(report, fp, indent=2)
+
+        self.print_results(results)
+        if options["compare"]:
+            with open(options["compare"]) as fp:
+                self.print_comparison(json.load(fp)["results"], results)
+
+    def meta(self, dataset, options):
+        try:
+            commit = subprocess.run(
+                ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            commit = None
+
+        return {
+            "commit": commit,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "database": connection.vendor,
+            "dataset": dataset,
+            "iterations": options["iterations"],
+            "warm": options["warm"],
+        }
+
+    def endpoints(self):
+        """
+        Return the acting user and the endpoints to run, in order, as
+        (name, method, url(i), body(i), expected status, response callback).
+        """
+        user = User.objects.get(email="bench0@example.com")
+        project = TravelProject.objects.filter(user=user).order_by("pk").first()
+        project_place = TravelProjectPlace.objects.filter(project=project).order_by("pk").first()
+        run = uuid.uuid4().hex[:8]
+        created = []
+
+        def created_project(i):
+            return created[i]
+
+        def remember_project(response):
+            created.append(response.data["id"])
+
+        return user, [
+            ("project list", "get", lambda i: reverse("travel-project-list-list"), None, 200, None),
+            ("project detail", "get", lambda i: reverse("travel-project-list-detail", args=[project.pk]), None, 200, None),
+            ("project create", "post", lambda i: reverse("travel-project-list-list"),
+                lambda i: {"name": f"bench-{run}-{i}", "places": [1, 2, 3, 4, 5]}, 201, remember_project),
+            ("project update", "patch", lambda i: reverse("travel-project-list-detail", args=[created_project(i)]),
+                lambda i: {"description": f"Updated {i}"}, 200, None),
+            ("add place", "post", lambda i: reverse("add-place"),
+                lambda i: {"project": created_project(i), "place": 6}, 201, None),
+            ("batch places", "post", lambda i: reverse("travel-project-list-batch-places", args=[created_project(i)]),
+                lambda i: {"add": [7, 8], "remove": [6]}, 200, None),
+            ("project delete", "delete", lambda i: reverse("travel-project-list-detail", args=[created_project(i)]),
+                None, 204, None),
+            ("project place detail", "get",
+                lambda i: reverse("travel-project-place-edit-detail", args=[project_place.pk]), None, 200, None),
+            ("project place update", "patch",
+                lambda i: reverse("travel-project-place-edit-detail", args=[project_place.pk]),
+                lambda i: {"visited": i % 2 == 0}, 200, None),
+            ("place list", "get", lambda i: reverse("place-list"), None, 200, None),
+            ("place search", "get", lambda i: f"{reverse('place-search')}?q=bridge", None, 200, None),
+            ("async project list", "get", lambda i: reverse("async-travel-project-list"), None, 200, None),
+            ("async project detail", "get",
+                lambda i: reverse("async-travel-project-detail", args=[project.pk]), None, 200, None),
+            ("async place list", "get", lambda i: reverse("async-place-list"), None, 200, None),
+            ("profile", "get", lambda i: reverse("profile"), None, 200, None),
+            ("async profile", "get", lambda i: reverse("async-profile"), None, 200, None),
+            ("register", "post", lambda i: reverse("register-list"),
+                lambda i: {"email": f"bench-{run}-{i}@example.com", "password": BENCHMARK_PASSWORD,
+                           "first_name": "Bench", "last_name": "Register"}, 201, None),
+            ("login", "post", lambda i: reverse("login"),
+                lambda i: {"email": user.email, "password": BENCHMARK_PASSWORD}, 200, None),
+        ]
+
+    def run_endpoints(self, options):
+        user, endpoints = self.endpoints()
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(user).access_token}")
+
+        if options["endpoints"]:
+            selected = [e for e in endpoints if any(name in e[0] for name in options["endpoints"])]
+            # Write endpoints act on the projects created by "project create".
+            if any(e[0] in ("project update", "add place", "batch places", "project delete") for e in selected):
+                selected = [e for e in endpoints if e[0] == "project create" or e in selected]
+            endpoints = selected
+
+        iterations = options["iterations"]
+        total = iterations + options["alloc_iterations"]
+        results = {}
+        for name, method, url, body, expected, on_response in endpoints:
+            self.stdout.write(f"Benchmarking {name}...")
+            latencies, queries, allocations, errors = [], [], [], 0
+
+            for i in range(total):
+                if not options["warm"]:
+                    cache.clear()
+                traced = i >= iterations
+                if traced:
+                    tracemalloc.start()
+
+                with CaptureQueriesContext(connection) as context:
+                    started = time.perf_counter()
+                    response = getattr(client, method)(url(i), body(i) if body else None, format="json")
+                    elapsed = (time.perf_counter() - started) * 1000
+
+                if traced:
+                    _, peak = tracemalloc.get_traced_memory()
+                    tracemalloc.stop()
+                    allocations.append(peak)
+                else:
+                    latencies.append(elapsed)
+                    queries.append(len(context.captured_queries))
+
+                if response.status_code != expected:
+                    errors += 1
+                    if errors == 1:
+                        self.stderr.write(f"{name}: unexpected status {response.status_code}")
+                elif on_response:
+                    on_response(response)
+
+            if errors and on_response:
+                raise CommandError(f"{name} failed, dependent endpoints can't run")
+
+            results[name] = self.summarize(latencies, queries, allocations, errors)
+        return results
+
+    def summarize(self, latencies, queries, allocations, errors):
+        if len(latencies) >= 2:
+            cuts = statistics.quantiles(latencies, n=100)
+            p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+        else:
+            p50 = p95 = p99 = latencies[0] if latencies else 0.0
+
+        return {
+            "requests": len(latencies),
+            "errors": errors,
+            "mean_ms": statistics.fmean(latencies) if latencies else 0.0,
+            "p50_ms": p50,
+            "p95_ms": p95,
+            "p99_ms": p99,
+            "queries": statistics.median(queries) if queries else 0,
+            "max_queries": max(queries, default=0),
+            "peak_alloc_kb": statistics.median(allocations) / 1024 if allocations else None,
+        }
+
+    def print_results(self, results):
+        self.stdout.write(
+            f"{'endpoint':<22}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'queries':>9}{'alloc KB':>10}{'errors':>8}"
+        )
+        for name, result in results.items():
+            alloc = f"{result['peak_alloc_kb']:.0f}" if result["peak_alloc_kb"] is not None else "-"
+            self.stdout.write(
+                f"{name:<22}{result['p50_ms']:>9.2f}{result['p95_ms']:>9.2f}{result['p99_ms']:>9.2f}"
+                f"{result['queries']:>9g}{alloc:>10}{result['errors']:>8}"
+            )
+
+    def print_comparison(self, baseline, results):
+        self.stdout.write("")
+        self.stdout.write(f"{'endpoint':<22}{'p50 change':>12}{'p95 change':>12}{'queries':>12}")
+        for name, result in results.items():
+            if name not in baseline:
+                continue
+            before = baseline[name]
+            self.stdout.write(
+                f"{name:<22}{self.change(before['p50_ms'], result['p50_ms']):>12}"
+                f"{self.change(before['p95_ms'], result['p95_ms']):>12}"
+                f"{before['queries']:>5g} -> {result['queries']:<4g}"
+            )
+
+    def change(self, before, after):
+        if not before:
+            return "-"
+        return f"{(after - before) / before * 100:+.1f}%"
@@ -0,0 +1,136 @@
+import json
+import random
+import statistics
+import time
+import uuid
+
+from django.apps.registry import Apps
+from django.core.management.base import BaseCommand
+from django.db import connection, models, transaction
+
+from travel_planner.ids import uuid7
+
+# Primary key strategies compared: (name, field for the parent and child tables).
+STRATEGIES = [
+    ("uuid4", lambda: models.UUIDField(primary_key=True, default=uuid.uuid4)),
+    ("uuid7", lambda: models.UUIDField(primary_key=True, default=uuid7)),
+    ("bigint", lambda: models.BigAutoField(primary_key=True)),
+]
+
+
+def build_models(name, pk_field):
+    """Throwaway parent/child models shaped like TravelProject/TravelProjectPlace."""
+    apps = Apps()
+    meta = {"apps": apps, "app_label": "pk_benchmark"}
+
+    parent = type(f"Parent_{name}", (models.Model,), {
+        "__module__": __name__,
+        "id": pk_field(),
+        "name": models.CharField(max_length=50),
+        "Meta": type("Meta", (), {**meta, "db_table": f"pk_benchmark_{name}_parent"}),
+    })
+    child = type(f"Child_{name}", (models.Model,), {
+        "__module__": __name__,
+        "id": pk_field(),
+        "parent": models.ForeignKey(parent, on_delete=models.CASCADE),
+        "place_id": models.IntegerField(),
+        "visited": models.BooleanField(default=False),
+        "Meta": type("Meta", (), {**meta, "db_table": f"pk_benchmark_{name}_child"}),
+    })
+    return parent, child
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare insert and join throughput of uuid4, uuid7 and bigint primary keys on throwaway "
+        "tables shaped like TravelProject/TravelProjectPlace (run against a scratch or test database)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--parents", type=int, default=10_000)
+        parser.add_argument("--children-per-parent", type=int, default=20)
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--joins", type=int, default=200, help="Timed join queries per strategy")
+        parser.add_argument("--strategies", nargs="*", choices=[name for name, _ in STRATEGIES])
+        parser.add_argument("--json", action="store_true", help="Print results as JSON")
+
+    def handle(self, *args, **options):
+        results = {}
+        for name, pk_field in STRATEGIES:
+            if options["strategies"] and name not in options["strategies"]:
+                continue
+            self.stdout.write(f"Benchmarking {name} keys...")
+            parent, child = build_models(name, pk_field)
+            with connection.schema_editor() as editor:
+                editor.create_model(parent)
+                editor.create_model(child)
+            try:
+                results[name] = self.run(parent, child, options)
+            finally:
+                with connection.schema_editor() as editor:
+                    editor.delete_model(child)
+                    editor.delete_model(parent)
+
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+
+        self.stdout.write(
+            f"{'keys':<8}{'insert rows/s':>15}{'first 10%':>12}{'last 10%':>12}{'join q/s':>10}{'index MB':>10}"
+        )
+        for name, result in results.items():
+            index = f"{result['index_mb']:.1f}" if result["index_mb"] is not None else "-"
+            self.stdout.write(
+                f"{name:<8}{result['insert_rows_per_s']:>15.0f}{result['first_batches_rows_per_s']:>12.0f}"
+                f"{result['last_batches_rows_per_s']:>12.0f}{result['join_queries_per_s']:>10.1f}{index:>10}"
+            )
+
+    def run(self, parent, child, options):
+        rng = random.Random(0)
+        batch_size = options["batch_size"]
+
+        parents = []
+        for start in range(0, options["parents"], batch_size):
+            with transaction.atomic():
+                parents.extend(parent.objects.bulk_create(
+                    [parent(name=f"project {i}") for i in range(start, min(start + batch_size, options["parents"]))]
+                ))
+
+        # Children are inserted one batch per transaction, like projects gaining places over
+        # time; the per-batch rate shows whether inserts slow down as the table grows.
+        children = [
+            (p.pk, rng.randrange(1, 100_000)) for p in parents for _ in range(options["children_per_parent"])
+        ]
+        batch_rates, inserted, elapsed = [], 0, 0.0
+        for start in range(0, len(children), batch_size):
+            batch = [child(parent_id=pk, place_id=place) for pk, place in children[start:start + batch_size]]
+            started = time.perf_counter()
+            with transaction.atomic():
+                child.objects.bulk_create(batch)
+            took = time.perf_counter() - started
+            batch_rates.append(len(batch) / took)
+            inserted += len(batch)
+            elapsed += took
+
+        tenth = max(1, len(batch_rates) // 10)
+        sample = [p.pk for p in rng.sample(parents, min(len(parents), options["joins"]))]
+        started = time.perf_counter()
+        for pk in sample:
+            list(child.objects.filter(parent_id=pk).select_related("parent"))
+        join_elapsed = time.perf_counter() - started
+
+        return {
+            "rows": inserted,
+            "insert_rows_per_s": inserted / elapsed if elapsed else 0.0,
+            "first_batches_rows_per_s": statistics.fmean(batch_rates[:tenth]) if batch_rates else 0.0,
+            "last_batches_rows_per_s": statistics.fmean(batch_rates[-tenth:]) if batch_rates else 0.0,
+            "join_queries_per_s": len(sample) / join_elapsed if join_elapsed else 0.0,
+            "index_mb": self.index_size(child),
+        }
+
+    def index_size(self, model):
+        if connection.vendor != "postgresql":
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_indexes_size(%s)", [model._meta.db_table])
+            return cursor.fetchone()[0] / (1024 * 1024)
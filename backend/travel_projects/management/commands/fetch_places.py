@@ -1,16 +1,83 @@
+import json
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from itertools import islice
+from pathlib import Path
+
 import requests
-from django.core.management.base import BaseCommand
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from travel_planner.caching import PLACES_SCOPE, bump_cache_version
+from travel_planner.metrics import IMPORT_LAST_PAGE, IMPORT_PAGES, IMPORT_PLACES, IMPORT_TOTAL_PAGES
 
+from ...catalogue import bump_catalogue_version
 from ...models import Place
 
 API_URL = "https://api.artic.edu/api/v1/artworks/search"
 LIMIT = 100
+WORKERS = 8
+BATCH_SIZE = 1000
+CHECKPOINT_FILE = settings.BASE_DIR / ".fetch_places_checkpoint.json"
 
 
 class Command(BaseCommand):
     help = "Fetch artworks from API and store them as Places"
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrent",
+            action="store_true",
+            help="Fetch pages in parallel and upsert each page with a single bulk query",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=WORKERS,
+            help="Number of pages fetched in parallel in concurrent mode",
+        )
+        parser.add_argument(
+            "--checkpoint",
+            default=str(CHECKPOINT_FILE),
+            help="File storing the last fully imported page in concurrent mode",
+        )
+        parser.add_argument(
+            "--restart",
+            action="store_true",
+            help="Ignore the saved checkpoint and import from the first page",
+        )
+        parser.add_argument(
+            "--source",
+            help="Import from a saved API page (.json), a JSONL dump or a directory of them instead of the API",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=BATCH_SIZE,
+            help="Number of places written per bulk query when importing from --source",
+        )
+
     def handle(self, *args, **options):
+        try:
+            self.import_places(options)
+        finally:
+            # Once per run rather than per page: until then requests look up places
+            # missing from the in-memory catalogue in the database.
+            bump_catalogue_version()
+
+    def import_places(self, options):
+        if options["source"]:
+            self.import_local(Path(options["source"]), batch_size=max(1, options["batch_size"]))
+            return
+
+        if options["concurrent"]:
+            self.import_concurrent(
+                workers=max(1, options["workers"]),
+                checkpoint=Path(options["checkpoint"]),
+                restart=options["restart"],
+            )
+            return
+
         url = f"{API_URL}?limit={LIMIT}&page=1"
 
         while url:
@@ -23,6 +90,8 @@ class Command(BaseCommand):
             data = response.json()
             artworks = data.get("data", [])
 
+            IMPORT_PAGES.labels("api").inc()
+            IMPORT_PLACES.labels("api").inc(len(artworks))
             for art in artworks:
                 place, created = Place.objects.get_or_create(
                     id=art["id"],
@@ -35,4 +104,145 @@ class Command(BaseCommand):
             if url:
                 self.stdout.write(f"Next page: {url}")
             else:
-                self.stdout.write("All pages processed.")
\ No newline at end of file
+                self.stdout.write("All pages processed.")
+
+    def import_concurrent(self, workers, checkpoint, restart):
+        last_page = 0 if restart else self.load_checkpoint(checkpoint)
+        if last_page:
+            self.stdout.write(f"Resuming after page {last_page}")
+
+        session = self.build_session(workers)
+        data = self.fetch_page(session, last_page + 1)
+        total_pages = data.get("pagination", {}).get("total_pages", last_page + 1)
+        IMPORT_TOTAL_PAGES.set(total_pages)
+
+        self.upsert_places(data.get("data", []))
+        last_page += 1
+        self.save_checkpoint(checkpoint, last_page)
+        IMPORT_LAST_PAGE.set(last_page)
+
+        pages = iter(range(last_page + 1, total_pages + 1))
+        completed = set()
+
+        error = None
+
+        executor = ThreadPoolExecutor(max_workers=workers)
+        try:
+            # Keep a bounded window of requests in flight; database writes stay on this thread.
+            futures = {}
+            for page in pages:
+                futures[executor.submit(self.fetch_page, session, page)] = page
+                if len(futures) >= workers * 2:
+                    break
+
+            while futures:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    page = futures.pop(future)
+                    try:
+                        data = future.result()
+                    except (CommandError, requests.RequestException) as exc:
+                        # Stop scheduling, but drain the pages already in flight first.
+                        error = error or exc
+                        continue
+
+                    self.upsert_places(data.get("data", []))
+                    completed.add(page)
+
+                    next_page = next(pages, None) if error is None else None
+                    if next_page is not None:
+                        futures[executor.submit(self.fetch_page, session, next_page)] = next_page
+
+                # Only pages without gaps below them count as done, so a resume never skips one.
+                while last_page + 1 in completed:
+                    last_page += 1
+                    completed.remove(last_page)
+                self.save_checkpoint(checkpoint, last_page)
+                IMPORT_LAST_PAGE.set(last_page)
+                self.stdout.write(f"Imported {last_page}/{total_pages} pages")
+        finally:
+            executor.shutdown(cancel_futures=True)
+            session.close()
+
+        if error is not None:
+            raise CommandError(f"Import stopped after page {last_page}: {error}")
+
+        checkpoint.unlink(missing_ok=True)
+        self.stdout.write("All pages processed.")
+
+    def import_local(self, source, batch_size):
+        if source.is_dir():
+            files = sorted(path for path in source.iterdir() if path.suffix in (".json", ".jsonl"))
+        elif source.exists():
+            files = [source]
+        else:
+            raise CommandError(f"{source} does not exist")
+
+        artworks = self.iter_local_artworks(files)
+        total = 0
+        while batch := list(islice(artworks, batch_size)):
+            total += self.upsert_places(batch, source="local")
+            self.stdout.write(f"Imported {total} places")
+
+        self.stdout.write(f"All files processed: {len(files)} file(s), {total} places.")
+
+    def iter_local_artworks(self, files):
+        # JSONL dumps are read line by line and saved pages one at a time,
+        # so memory is bounded by a single page whatever the dump size.
+        for path in files:
+            with path.open(encoding="utf-8") as fp:
+                if path.suffix == ".jsonl":
+                    for line in fp:
+                        if line.strip():
+                            record = json.loads(line)
+                            yield from record["data"] if "data" in record else [record]
+                else:
+                    page = json.load(fp)
+                    # A saved API page, or a plain list of artworks.
+                    if isinstance(page, list):
+                        yield from page
+                    elif isinstance(page, dict):
+                        yield from page.get("data", [])
+                    else:
+                        raise CommandError(f"{path}: expected an API page or a list of artworks")
+
+    def build_session(self, workers):
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=workers)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def fetch_page(self, session, page):
+        url = f"{API_URL}?limit={LIMIT}&page={page}"
+        response = session.get(url)
+        if response.status_code != 200:
+            raise CommandError(f"Error fetching {url}: {response.status_code}")
+        return response.json()
+
+    def upsert_places(self, artworks, source="api"):
+        # Deduplicate by id: a single upsert statement can't touch the same row twice.
+        places = {art["id"]: Place(id=art["id"], title=art["title"]) for art in artworks}
+        IMPORT_PAGES.labels(source).inc()
+        IMPORT_PLACES.labels(source).inc(len(places))
+        if not places:
+            return 0
+
+        Place.objects.bulk_create(
+            places.values(),
+            update_conflicts=True,
+            unique_fields=["id"],
+            update_fields=["title"],
+        )
+        bump_cache_version(PLACES_SCOPE)
+        return len(places)
+
+    def load_checkpoint(self, checkpoint):
+        if not checkpoint.exists():
+            return 0
+        return json.loads(checkpoint.read_text()).get("last_page", 0)
+
+    def save_checkpoint(self, checkpoint, last_page):
+        tmp = checkpoint.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"last_page": last_page}))
+        tmp.replace(checkpoint)
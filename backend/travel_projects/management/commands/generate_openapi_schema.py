@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from travel_planner.schema import SCHEMA_FILES, render_schema
+
+
+class Command(BaseCommand):
+    help = "Generate the OpenAPI schema once and write it to OPENAPI_SCHEMA_DIR for the schema views to serve"
+
+    def handle(self, *args, **options):
+        directory = settings.OPENAPI_SCHEMA_DIR
+        directory.mkdir(parents=True, exist_ok=True)
+
+        for fmt in ("json", "yaml"):
+            path = directory / SCHEMA_FILES[fmt]
+            tmp = path.with_name(f"{path.name}.tmp")
+            tmp.write_bytes(render_schema(fmt))
+            tmp.replace(path)
+
+        self.stdout.write(f"Wrote the schema to {directory}")
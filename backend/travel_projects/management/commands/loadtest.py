@@ -0,0 +1,147 @@
+import http.client
+import json
+import statistics
+import threading
+import time
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+# (name, sync DRF path, async path)
+ENDPOINTS = [
+    ("project list", "/travel/travel_project/", "/travel/async/travel_project/"),
+    ("project detail", "/travel/travel_project/{project}/", "/travel/async/travel_project/{project}/"),
+    ("place list", "/travel/place/", "/travel/async/place/"),
+    ("profile", "/user/profile/", "/user/async/profile/"),
+]
+
+
+class Command(BaseCommand):
+    help = "Load-test the sync (DRF) and async read endpoints of a running server and compare throughput"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--base-url", default="http://localhost:8000", help="Server to test")
+        parser.add_argument("--token", help="JWT access token used for every request")
+        parser.add_argument("--email", help="Log in with these credentials when no token is given")
+        parser.add_argument("--password")
+        parser.add_argument("--concurrency", type=int, default=50, help="Number of concurrent clients")
+        parser.add_argument("--duration", type=float, default=10, help="Seconds to run each endpoint")
+        parser.add_argument(
+            "--mode",
+            choices=["both", "sync", "async"],
+            default="both",
+            help="Which variant of every endpoint to hit",
+        )
+        parser.add_argument("--json", action="store_true", help="Print results as JSON")
+
+    def handle(self, *args, **options):
+        target = urlsplit(options["base_url"])
+        token = options["token"] or self.login(target, options["email"], options["password"])
+        headers = {"Authorization": f"Bearer {token}"}
+
+        project = self.first_project(target, headers)
+        modes = ["sync", "async"] if options["mode"] == "both" else [options["mode"]]
+
+        results = []
+        for name, sync_path, async_path in ENDPOINTS:
+            if "{project}" in sync_path and project is None:
+                self.stderr.write(f"Skipping {name}: the user has no projects")
+                continue
+
+            for mode in modes:
+                path = (sync_path if mode == "sync" else async_path).format(project=project)
+                result = self.run(target, path, headers, options["concurrency"], options["duration"])
+                results.append({"endpoint": name, "mode": mode, "path": path, **result})
+
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+
+        self.stdout.write(f"{'endpoint':<16}{'mode':<7}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'errors':>8}")
+        for result in results:
+            self.stdout.write(
+                f"{result['endpoint']:<16}{result['mode']:<7}{result['rps']:>9.1f}"
+                f"{result['p50']:>9.1f}{result['p95']:>9.1f}{result['p99']:>9.1f}{result['errors']:>8}"
+            )
+
+    def connect(self, target):
+        connection_class = http.client.HTTPSConnection if target.scheme == "https" else http.client.HTTPConnection
+        return connection_class(target.hostname, target.port, timeout=30)
+
+    def request(self, connection, method, path, headers, body=None):
+        connection.request(method, path, body=body, headers=headers)
+        response = connection.getresponse()
+        return response.status, response.read()
+
+    def login(self, target, email, password):
+        if not email or not password:
+            raise CommandError("Pass --token or --email and --password")
+
+        connection = self.connect(target)
+        body = json.dumps({"email": email, "password": password})
+        status, content = self.request(
+            connection, "POST", "/user/login/", {"Content-Type": "application/json"}, body
+        )
+        connection.close()
+        if status != 200:
+            raise CommandError(f"Login failed with status {status}")
+        return json.loads(content)["access_token"]
+
+    def first_project(self, target, headers):
+        connection = self.connect(target)
+        status, content = self.request(connection, "GET", "/travel/travel_project/", headers)
+        connection.close()
+        if status != 200:
+            raise CommandError(f"Listing projects failed with status {status}")
+        projects = json.loads(content)
+        return projects[0]["id"] if projects else None
+
+    def run(self, target, path, headers, concurrency, duration):
+        latencies = []
+        errors = 0
+        lock = threading.Lock()
+        deadline = time.perf_counter() + duration
+
+        def client():
+            nonlocal errors
+            connection = self.connect(target)
+            local_latencies, local_errors = [], 0
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                try:
+                    status, _ = self.request(connection, "GET", path, headers)
+                except (OSError, http.client.HTTPException):
+                    connection.close()
+                    connection = self.connect(target)
+                    status = None
+                if status == 200:
+                    local_latencies.append((time.perf_counter() - started) * 1000)
+                else:
+                    local_errors += 1
+            connection.close()
+            with lock:
+                latencies.extend(local_latencies)
+                errors += local_errors
+
+        started = time.perf_counter()
+        threads = [threading.Thread(target=client) for _ in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        if len(latencies) >= 2:
+            cuts = statistics.quantiles(latencies, n=100)
+            p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+        else:
+            p50 = p95 = p99 = latencies[0] if latencies else 0.0
+
+        return {
+            "requests": len(latencies),
+            "errors": errors,
+            "rps": len(latencies) / elapsed,
+            "p50": p50,
+            "p95": p95,
+            "p99": p99,
+        }
@@ -0,0 +1,74 @@
+import random
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from user.models import User
+
+from ...models import Place, TravelProject, TravelProjectPlace
+
+BATCH_SIZE = 5000
+BENCHMARK_PASSWORD = "benchmark-Passw0rd"
+WORDS = [
+    "Portrait", "Landscape", "Study", "Still", "Life", "River", "Garden", "Bridge", "Woman", "Man",
+    "Night", "Morning", "Harbor", "Mountain", "Village", "Street", "Flowers", "Sea", "Bedroom", "Dancers",
+    "Water", "Lilies", "Window", "Cathedral", "Forest", "Horse", "Boats", "Winter", "Summer", "Head",
+]
+
+
+class Command(BaseCommand):
+    help = "Seed the database with a synthetic dataset for benchmarks (use a scratch database)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=50)
+        parser.add_argument("--projects", type=int, default=20, help="Projects per user")
+        parser.add_argument("--places-per-project", type=int, default=10)
+        parser.add_argument("--catalogue", type=int, default=100_000, help="Number of Place rows")
+        parser.add_argument("--seed", type=int, default=0, help="Random seed, for reproducible datasets")
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        catalogue = options["catalogue"]
+        places_per_project = min(options["places_per_project"], catalogue)
+
+        Place.objects.bulk_create(
+            (Place(id=i, title=" ".join(rng.sample(WORDS, 3))) for i in range(1, catalogue + 1)),
+            batch_size=BATCH_SIZE,
+        )
+
+        # Hashing once keeps seeding fast; every user shares BENCHMARK_PASSWORD.
+        password = make_password(BENCHMARK_PASSWORD)
+        users = User.objects.bulk_create(
+            [
+                User(email=f"bench{i}@example.com", first_name="Bench", last_name=str(i), password=password)
+                for i in range(options["users"])
+            ],
+            batch_size=BATCH_SIZE,
+        )
+
+        projects, project_places = [], []
+        for user in users:
+            for p in range(options["projects"]):
+                visited = [rng.random() < 0.3 for _ in range(places_per_project)]
+                project = TravelProject(
+                    user=user,
+                    name=f"bench-{user.last_name}-{p}",
+                    place_count=places_per_project,
+                    visited_count=sum(visited),
+                    completed=all(visited),
+                )
+                projects.append(project)
+                project_places.extend(
+                    TravelProjectPlace(project=project, place_id=place_id, visited=is_visited)
+                    for place_id, is_visited in zip(rng.sample(range(1, catalogue + 1), places_per_project), visited)
+                )
+
+        TravelProject.objects.bulk_create(projects, batch_size=BATCH_SIZE)
+        TravelProjectPlace.objects.bulk_create(project_places, batch_size=BATCH_SIZE)
+
+        self.stdout.write(
+            f"Seeded {catalogue} places, {len(users)} users, {len(projects)} projects "
+            f"and {len(project_places)} project places."
+        )
@@ -0,0 +1,38 @@
+# Generated by Django 6.0.2 on 2026-10-18 18:31
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def backfill_counters(apps, schema_editor):
+    TravelProject = apps.get_model('travel_projects', 'TravelProject')
+    TravelProjectPlace = apps.get_model('travel_projects', 'TravelProjectPlace')
+
+    places = TravelProjectPlace.objects.filter(project=models.OuterRef('pk')).order_by()
+    place_count = places.values('project').annotate(n=models.Count('pk')).values('n')
+    visited_count = places.filter(visited=True).values('project').annotate(n=models.Count('pk')).values('n')
+    TravelProject.objects.update(
+        place_count=Coalesce(models.Subquery(place_count), 0),
+        visited_count=Coalesce(models.Subquery(visited_count), 0),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('travel_projects', '0002_place_title_trgm'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='travelproject',
+            name='place_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='travelproject',
+            name='visited_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 6.0.2 on 2026-10-18 18:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('travel_projects', '0003_travelproject_counters'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='place',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AlterField(
+            model_name='travelproject',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AlterField(
+            model_name='travelprojectplace',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
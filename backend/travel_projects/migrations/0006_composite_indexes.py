@@ -0,0 +1,39 @@
+# Generated by Django 6.0.2 on 2026-10-18 18:54
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('travel_projects', '0005_uuid7_primary_keys'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    # The new indexes are built before the foreign key indexes they replace are dropped.
+    operations = [
+        migrations.AddIndex(
+            model_name='place',
+            index=models.Index(fields=['-created_at'], name='place_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='travelproject',
+            index=models.Index(fields=['user', '-created_at'], name='travelproject_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='travelprojectplace',
+            index=models.Index(condition=models.Q(('visited', False)), fields=['project'], name='tpp_project_unvisited_idx'),
+        ),
+        migrations.AlterField(
+            model_name='travelproject',
+            name='user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='travelprojectplace',
+            name='project',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='travel_projects.travelproject'),
+        ),
+    ]
@@ -1,11 +1,12 @@
-import uuid
 from django.db import models
 from django.utils import timezone
 
+from travel_planner.ids import uuid7
+
 class ModelMixin(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, unique=True)
+    id = models.UUIDField(primary_key=True, default=uuid7)
     created_at = models.DateTimeField(default=timezone.now)
-    updated_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ["-created_at"]
@@ -1,49 +1,164 @@
-from django.db import models
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.core.exceptions import ValidationError
+from django.db import connections, models, transaction
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 
+from travel_planner.caching import bump_cache_version, projects_scope
 from user.models import User
 
 from .mixins import ModelMixin
 
+MAX_PROJECT_PLACES = 10
+
+class PlaceQuerySet(models.QuerySet):
+    def search(self, query):
+        # Titles starting with the query rank above every other match.
+        prefix = models.Case(
+            models.When(title__istartswith=query, then=models.Value(1.0)),
+            default=models.Value(0.0),
+            output_field=models.FloatField(),
+        )
+        if connections[self.db].vendor != "postgresql":
+            # No pg_trgm outside Postgres: plain substring match, prefix matches first.
+            return self.filter(title__icontains=query).annotate(
+                rank=prefix + models.Value(0.5)
+            ).order_by("-rank", "id")
+
+        # Served by the place_title_trgm GIN index created in migration 0002. Word
+        # similarity is 1.0 for any title containing the whole word, so it can't
+        # tell a prefix match from a match further in.
+        return self.filter(title__trigram_word_similar=query).annotate(
+            rank=TrigramWordSimilarity(query, "title") + prefix
+        ).order_by("-rank", "id")
+
 class Place(ModelMixin):
     id = models.IntegerField(primary_key=True, unique=True)
     title = models.CharField(max_length=255)
 
+    objects = PlaceQuerySet.as_manager()
+
+    class Meta(ModelMixin.Meta):
+        # The admin changelist pages through the whole catalogue newest first.
+        indexes = [models.Index(fields=["-created_at"], name="place_created_idx")]
+
     def __str__(self):
         return f"{self.title}"
 
+class TravelProjectQuerySet(models.QuerySet):
+    def update_counters(self, places=0, visited=0):
+        # SET expressions read the pre-update row, so `completed` compares the shifted counters.
+        # A single UPDATE keeps concurrent writers from losing each other's changes.
+        return self.update(
+            updated_at=timezone.now(),
+            place_count=models.F("place_count") + places,
+            visited_count=models.F("visited_count") + visited,
+            completed=models.Case(
+                models.When(visited_count=models.F("place_count") + places - visited, then=models.Value(True)),
+                default=models.Value(False),
+            ),
+        )
+
+    def recount(self):
+        places = TravelProjectPlace.objects.filter(project=models.OuterRef("pk")).order_by()
+        place_count = places.values("project").annotate(n=models.Count("pk")).values("n")
+        visited_count = places.filter(visited=True).values("project").annotate(n=models.Count("pk")).values("n")
+        return self.update(
+            updated_at=timezone.now(),
+            place_count=Coalesce(models.Subquery(place_count), 0),
+            visited_count=Coalesce(models.Subquery(visited_count), 0),
+            completed=~models.Exists(places.filter(visited=False)),
+        )
+
 class TravelProject(ModelMixin):
-    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    # Indexed by travelproject_user_created_idx, which also serves plain user lookups.
+    user = models.ForeignKey(User, on_delete=models.CASCADE, db_index=False)
     name = models.CharField(max_length=50, unique=True)
     description = models.TextField(null=True, blank=True)
     start_date = models.DateField(null=True, blank=True)
     completed = models.BooleanField(default=False)
+    place_count = models.PositiveIntegerField(default=0)
+    visited_count = models.PositiveIntegerField(default=0)
+
+    objects = TravelProjectQuerySet.as_manager()
+
+    class Meta(ModelMixin.Meta):
+        # Project lists filter by user and sort newest first (the default ordering).
+        indexes = [models.Index(fields=["user", "-created_at"], name="travelproject_user_created_idx")]
 
     def __str__(self):
         return f"{self.name} - {self.start_date}"
     
 class TravelProjectPlace(ModelMixin):
-    project = models.ForeignKey(TravelProject, on_delete=models.CASCADE)
+    # Lookups by project use the (project, place) unique index.
+    project = models.ForeignKey(TravelProject, on_delete=models.CASCADE, db_index=False)
     place = models.ForeignKey(Place, on_delete=models.CASCADE)
     notes = models.TextField(blank=True, null=True)
     visited = models.BooleanField(default=False)
 
     class Meta:
         unique_together = ("project", "place")
+        indexes = [
+            # recount() and the completed flag look for a project's unvisited places;
+            # only those rows are indexed, so the index stays small as trips get done.
+            models.Index(fields=["project"], condition=models.Q(visited=False), name="tpp_project_unvisited_idx"),
+        ]
 
     def __str__(self):
         return f"{self.project.name} - {self.place.title}"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_visited = instance.__dict__.get("visited")
+        return instance
+
     def save(self, *args, **kwargs):
-        super().save(*args, **kwargs)
-        self._update_project_completed()
+        if self._state.adding:
+            with transaction.atomic():
+                super().save(*args, **kwargs)
+                # The counter UPDATE locks the project row until commit, so concurrent adds
+                # count the rows one after another and can't exceed the cap together. The
+                # rows are counted rather than place_count, which bulk deletes bypass.
+                self._update_project_counters(places=1, visited=int(self.visited))
+                if TravelProjectPlace.objects.filter(project_id=self.project_id).count() > MAX_PROJECT_PLACES:
+                    raise ValidationError(f"A project can contain at most {MAX_PROJECT_PLACES} places.")
+        elif self.visited != getattr(self, "_loaded_visited", self.visited):
+            with transaction.atomic():
+                # One conditional UPDATE writes the whole row, and only the writer that
+                # actually flips it moves the counter.
+                self.updated_at = timezone.now()
+                update_fields = kwargs.get("update_fields")
+                values = {
+                    field.attname: getattr(self, field.attname)
+                    for field in self._meta.concrete_fields
+                    if not field.primary_key
+                    and (update_fields is None or field.name in {*update_fields, "visited", "updated_at"})
+                }
+                flipped = TravelProjectPlace.objects.filter(pk=self.pk, visited=not self.visited).update(**values)
+                if flipped:
+                    self._update_project_counters(visited=1 if self.visited else -1)
+                else:
+                    # Already flipped by someone else; the other fields still need saving.
+                    super().save(*args, **kwargs)
+        else:
+            super().save(*args, **kwargs)
+        self._loaded_visited = self.visited
+        bump_cache_version(projects_scope(self.project.user_id))
 
     def delete(self, *args, **kwargs):
-        super().delete(*args, **kwargs)
-        self._update_project_completed()
-
-    def _update_project_completed(self):
-        project = self.project
-        all_visited = not project.travelprojectplace_set.filter(visited=False).exists()
-        if project.completed != all_visited:
-            project.completed = all_visited
-            project.save(update_fields=["completed"])
\ No newline at end of file
+        with transaction.atomic():
+            visited = (
+                TravelProjectPlace.objects.select_for_update()
+                .filter(pk=self.pk)
+                .values_list("visited", flat=True)
+                .first()
+            )
+            result = super().delete(*args, **kwargs)
+            if visited is not None:
+                self._update_project_counters(places=-1, visited=-int(visited))
+        bump_cache_version(projects_scope(self.project.user_id))
+        return result
+
+    def _update_project_counters(self, places=0, visited=0):
+        TravelProject.objects.filter(pk=self.project_id).update_counters(places=places, visited=visited)
@@ -1,31 +1,153 @@
 import logging
 
-from django.db import transaction
+from django.core.exceptions import FieldDoesNotExist, ValidationError as DjangoValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import Prefetch
+from django.utils import timezone
 
 from rest_framework import serializers
 
-from .models import Place, TravelProjectPlace, TravelProject
+from travel_planner.caching import bump_cache_version, projects_scope
+
+from .catalogue import missing_place_ids
+from .models import MAX_PROJECT_PLACES, Place, TravelProjectPlace, TravelProject
 
 LOGGER = logging.getLogger(__name__)
 
-class TravelProjectPlaceSerializer(serializers.ModelSerializer):
+class CataloguePlaceField(serializers.IntegerField):
+    """A Place id, checked against the in-memory place catalogue rather than the database."""
+
+    default_error_messages = {
+        "does_not_exist": 'Invalid pk "{pk_value}" - object does not exist.',
+    }
+
+    def to_internal_value(self, data):
+        place_id = super().to_internal_value(data)
+        if missing_place_ids([place_id]):
+            self.fail("does_not_exist", pk_value=place_id)
+        return place_id
+
+def parse_fieldset(value):
+    """
+    Parse ?fields= into a tree: "id,places.place.title" gives
+    {"id": {}, "places": {"place": {"title": {}}}}. An empty subtree means all fields.
+    """
+    tree = {}
+    for path in value.split(","):
+        node = tree
+        for name in path.strip().split("."):
+            if name:
+                node = node.setdefault(name, {})
+    return tree
+
+def sparse_fieldset_kwargs(query_params):
+    return {
+        "fields": parse_fieldset(query_params.get("fields", "")),
+        "expand": {name.strip() for name in query_params.get("expand", "").split(",") if name.strip()},
+    }
+
+class SparseFieldsetMixin:
+    """
+    Renders only the `fields` asked for (a tree from parse_fieldset) and the relations
+    named in `expand` as nested objects rather than ids. optimize_queryset() narrows
+    a queryset to the columns and joins those fields read.
+    """
+
+    # Relation fields ?expand= can replace with a nested serializer.
+    expandable_fields = {}
+
+    def __init__(self, *args, fields=None, expand=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fieldset = fields or {}
+        self.expand = frozenset(expand)
+        if self.fieldset:
+            for name in set(self.fields) - set(self.fieldset):
+                del self.fields[name]
+        for name, serializer_class in self.expandable_fields.items():
+            if name in self.expand and name in self.fields:
+                self.fields[name] = serializer_class(read_only=True, **self.nested_kwargs(name))
+
+    def nested_kwargs(self, name):
+        return {"fields": self.fieldset.get(name), "expand": self.expand}
+
+    def optimize_queryset(self, queryset, *required):
+        """Load only the rendered columns (plus `required`) and join expanded relations."""
+        columns, related = self.load_paths(queryset.model)
+        queryset = queryset.only(*columns, *required)
+        return queryset.select_related(*related) if related else queryset
+
+    def load_paths(self, model, prefix=""):
+        columns, related = [], []
+        for field in self.fields.values():
+            try:
+                model_field = model._meta.get_field(field.source)
+            except FieldDoesNotExist:
+                continue
+            if not model_field.concrete:
+                continue
+            columns.append(prefix + model_field.name)
+            if isinstance(field, SparseFieldsetMixin):
+                related.append(prefix + model_field.name)
+                nested_columns, nested_related = field.load_paths(
+                    model_field.related_model, f"{prefix}{model_field.name}__"
+                )
+                columns += nested_columns
+                related += nested_related
+        return columns, related
+
+class PlaceSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    class Meta:
+        model = Place
+        fields = ["id", "title", "created_at", "updated_at"]
+        read_only_fields = fields
+
+class TravelProjectPlaceSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    expandable_fields = {"place": PlaceSerializer}
 
     class Meta:
         model = TravelProjectPlace
         fields = ["id", "place", "notes", "visited", "created_at", "updated_at"]
         read_only_fields = ["id", "project"]
 
-class TravelProjectSerializer(serializers.ModelSerializer):
+class TravelProjectSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     places = serializers.SerializerMethodField()
 
     class Meta:
         model = TravelProject
-        fields = ["id", "name", "description", "places", "completed", "start_date", "created_at", "updated_at"]
-        read_only_fields = ["id", "places", "completed", "created_at", "updated_at"]
+        fields = [
+            "id", "name", "description", "places", "place_count", "visited_count", "completed", "start_date",
+            "created_at", "updated_at",
+        ]
+        read_only_fields = ["id", "places", "place_count", "visited_count", "completed", "created_at", "updated_at"]
 
     def get_places(self, obj):
-        places = TravelProjectPlace.objects.filter(project=obj)
-        return TravelProjectPlaceSerializer(places, many=True).data
+        places = obj.travelprojectplace_set.all()
+        return TravelProjectPlaceSerializer(places, many=True, **self.nested_kwargs("places")).data
+
+    def optimize_queryset(self, queryset, *required):
+        queryset = super().optimize_queryset(queryset, *required)
+        if "places" not in self.fields:
+            return queryset
+        # The prefetch needs "project" to hand each place to its project.
+        places = TravelProjectPlaceSerializer(**self.nested_kwargs("places")).optimize_queryset(
+            TravelProjectPlace.objects.all(), "project"
+        )
+        return queryset.prefetch_related(Prefetch("travelprojectplace_set", queryset=places))
+
+class TravelProjectSummarySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    """Project list entry with the place counters instead of the places themselves."""
+
+    class Meta:
+        model = TravelProject
+        fields = [
+            "id", "name", "description", "place_count", "visited_count", "completed", "start_date",
+            "created_at", "updated_at",
+        ]
+        read_only_fields = fields
+
+def wants_summary(query_params):
+    """True for ?summary=true (or 1): list projects with TravelProjectSummarySerializer."""
+    return query_params.get("summary", "").lower() in ("1", "true")
 
 class TravelProjectCreateSerializer(serializers.ModelSerializer):
     places = serializers.ListField(
@@ -37,67 +159,126 @@ class TravelProjectCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = TravelProject
         fields = ["id", "name", "description", "start_date", "places"]
+        # The unique name is enforced by the INSERT itself, see create().
+        extra_kwargs = {"name": {"validators": []}}
 
     def validate_places(self, places_ids):
-        if len(places_ids) > 10:
+        if len(places_ids) > MAX_PROJECT_PLACES:
             raise serializers.ValidationError("A project can contain less than 10 places")
 
         if len(set(places_ids)) != len(places_ids):
             raise serializers.ValidationError("List can't contain duplicates")
 
-        existing_ids = set(
-            Place.objects.filter(id__in=places_ids).values_list("id", flat=True)
-        )
-        missing_ids = set(places_ids) - existing_ids
-
-        if missing_ids:
+        if missing_place_ids(places_ids):
             raise serializers.ValidationError("Missing place specified")
 
         return places_ids
 
-    @transaction.atomic
     def create(self, validated_data):
         places_ids = validated_data.pop("places", [])
         user = self.context["request"].user
 
-        project = TravelProject.objects.create(user=user, **validated_data)
-
-        if places_ids:
-            places = Place.objects.filter(id__in=places_ids)
-
-            TravelProjectPlace.objects.bulk_create([
-                TravelProjectPlace(project=project, place=place)
-                for place in places
-            ])
+        try:
+            with transaction.atomic():
+                project = TravelProject.objects.create(user_id=user.pk, place_count=len(places_ids), **validated_data)
+                places = TravelProjectPlace.objects.bulk_create([
+                    TravelProjectPlace(project=project, place_id=place_id)
+                    for place_id in places_ids
+                ])
+        except IntegrityError:
+            # Only looked up when the insert failed, instead of before every insert.
+            if TravelProject.objects.filter(name=validated_data["name"]).exists():
+                raise serializers.ValidationError({"name": ["travel project with this name already exists."]})
+            raise
 
+        # The response renders the rows just inserted instead of reading them back.
+        project._prefetched_objects_cache = {"travelprojectplace_set": places}
         return project
+
+    def to_representation(self, instance):
+        return TravelProjectSerializer(instance, context=self.context).data
     
 class TravelProjectAddPlaceSerializer(serializers.Serializer):
     project = serializers.PrimaryKeyRelatedField(queryset=TravelProject.objects.all())
-    place = serializers.PrimaryKeyRelatedField(queryset=Place.objects.all())
+    place = CataloguePlaceField()
+
+    def add_place(self):
+        project = self.validated_data["project"]
+        place = self.validated_data["place"]
+
+        # No checks up front: the unique (project, place) constraint and the guarded
+        # counter update in TravelProjectPlace.save() reject duplicates and a full
+        # project atomically, even when requests race.
+        try:
+            tpp = TravelProjectPlace.objects.create(project=project, place_id=place)
+        except IntegrityError:
+            if TravelProjectPlace.objects.filter(project=project, place_id=place).exists():
+                raise serializers.ValidationError("This place is already in the project.")
+            raise
+        except DjangoValidationError as error:
+            raise serializers.ValidationError(error.messages)
+        return TravelProjectPlaceSerializer(tpp).data
+    
+class TravelProjectPlacesBatchSerializer(serializers.Serializer):
+    add = serializers.ListField(child=serializers.IntegerField(), required=False, default=list)
+    remove = serializers.ListField(child=serializers.IntegerField(), required=False, default=list)
+    visit = serializers.ListField(child=serializers.IntegerField(), required=False, default=list)
 
     def validate(self, attrs):
-        project = attrs.get("project")
-        place = attrs.get("place")
+        project = self.instance
+        add, remove, visit = attrs["add"], attrs["remove"], attrs["visit"]
+
+        for field in ("add", "remove", "visit"):
+            if len(set(attrs[field])) != len(attrs[field]):
+                raise serializers.ValidationError({field: "List can't contain duplicates"})
+
+        if set(add) & set(remove):
+            raise serializers.ValidationError("A place can't be added and removed at once.")
+
+        if set(visit) & set(remove):
+            raise serializers.ValidationError("A place can't be visited and removed at once.")
+
+        current_ids = set(
+            TravelProjectPlace.objects.filter(project=project).values_list("place_id", flat=True)
+        )
+
+        if set(add) & current_ids:
+            raise serializers.ValidationError({"add": "This place is already in the project."})
+
+        if missing_place_ids(add):
+            raise serializers.ValidationError({"add": "Missing place specified"})
 
-        if TravelProjectPlace.objects.filter(project=project, place=place).exists():
-            raise serializers.ValidationError("This place is already in the project.")
+        if set(remove) - current_ids:
+            raise serializers.ValidationError({"remove": "This place is not in the project."})
 
-        current_count = TravelProjectPlace.objects.filter(project=project).count()
-        if current_count + 1 > 10:
-            raise serializers.ValidationError("A project can contain at most 10 places.")
+        if set(visit) - current_ids - set(add):
+            raise serializers.ValidationError({"visit": "This place is not in the project."})
+
+        if len(current_ids) + len(add) - len(remove) > MAX_PROJECT_PLACES:
+            raise serializers.ValidationError(f"A project can contain at most {MAX_PROJECT_PLACES} places.")
 
         return attrs
 
-    def add_place(self):
-        project = self.validated_data["project"]
-        place = self.validated_data["place"]
+    def apply(self):
+        project = self.instance
+        add, remove, visit = (set(self.validated_data[field]) for field in ("add", "remove", "visit"))
 
-        tpp = TravelProjectPlace.objects.create(project=project, place=place)
-        return TravelProjectPlaceSerializer(tpp).data
-    
-class PlaceSerializer(serializers.ModelSerializer):
-    class Meta:
-        model = Place
-        fields = ["id", "title", "created_at", "updated_at"]
-        read_only_fields = fields
\ No newline at end of file
+        # Bulk statements skip TravelProjectPlace.save/delete; counters are recounted once below.
+        if remove:
+            TravelProjectPlace.objects.filter(project=project, place_id__in=remove).delete()
+
+        if add:
+            TravelProjectPlace.objects.bulk_create([
+                TravelProjectPlace(project=project, place_id=place_id, visited=place_id in visit)
+                for place_id in add
+            ])
+
+        if visit - add:
+            TravelProjectPlace.objects.filter(project=project, place_id__in=visit - add).update(
+                visited=True, updated_at=timezone.now()
+            )
+
+        TravelProject.objects.filter(pk=project.pk).recount()
+        bump_cache_version(projects_scope(project.user_id))
+        project.refresh_from_db()
+        return TravelProjectSerializer(project).data
@@ -0,0 +1,47 @@
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from travel_planner.caching import PLACES_SCOPE, bump_cache_version, projects_scope
+
+from .catalogue import bump_catalogue_version
+from .models import Place, TravelProject, TravelProjectPlace
+
+# TravelProjectPlace invalidates from its own save()/delete(): a post_delete receiver
+# would stop Django from fast-deleting place rows in bulk.
+
+@receiver(post_save, sender=TravelProject)
+@receiver(post_delete, sender=TravelProject)
+def invalidate_project_responses(sender, instance, **kwargs):
+    bump_cache_version(projects_scope(instance.user_id))
+
+
+@receiver(post_save, sender=Place)
+@receiver(post_delete, sender=Place)
+def invalidate_place_responses(sender, instance, **kwargs):
+    bump_cache_version(PLACES_SCOPE)
+
+
+# New places are found without a reload (see catalogue.missing_place_ids), deleted
+# ones would still pass validation until the catalogue is reloaded.
+@receiver(post_delete, sender=Place)
+def reload_place_catalogue(sender, instance, **kwargs):
+    bump_catalogue_version()
+
+
+# Deleting a Place cascades to its TravelProjectPlace rows in bulk, past the counters
+# their delete() keeps, so the projects that held it are recounted afterwards.
+@receiver(pre_delete, sender=Place)
+def remember_place_projects(sender, instance, **kwargs):
+    instance._project_ids = list(
+        TravelProjectPlace.objects.filter(place=instance).values_list("project_id", flat=True)
+    )
+
+
+@receiver(post_delete, sender=Place)
+def recount_place_projects(sender, instance, **kwargs):
+    project_ids = getattr(instance, "_project_ids", None)
+    if project_ids:
+        projects = TravelProject.objects.filter(pk__in=project_ids)
+        projects.recount()
+        user_ids = projects.values_list("user_id", flat=True).distinct()
+        bump_cache_version(*(projects_scope(user_id) for user_id in user_ids))
@@ -1,3 +1,902 @@
-from django.test import TestCase
+import io
+import json
+import logging.handlers
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection, connections
+from django.test.utils import CaptureQueriesContext
+from asgiref.sync import sync_to_async
+from django.test import override_settings
+from django.urls import reverse
+from prometheus_client import REGISTRY
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from travel_planner import schema
+from travel_planner.base_testcases import APITestCase, TestCase, TransactionTestCase, isolated_cache_dir
+from travel_planner.caching import bump_cache_version, get_cache_version, projects_scope
+from travel_planner.log_handlers import QueuedHandler
+from user.models import User
+
+from .catalogue import get_catalogue, get_catalogue_version, missing_place_ids
+from .models import Place, TravelProject, TravelProjectPlace
+
+
+def run_in_other_process(code):
+    """Run `code` in a fresh manage.py shell, like a management command or another worker."""
+    env = {**os.environ, "CACHE_DIR": isolated_cache_dir()}
+    env.pop("REDIS_URL", None)
+    subprocess.run(
+        [sys.executable, "-W", "ignore", "manage.py", "shell", "-c", code],
+        cwd=settings.BASE_DIR, env=env, check=True, capture_output=True,
+    )
+
+
+def create_places(count):
+    return Place.objects.bulk_create([Place(id=i, title=f"Place {i}") for i in range(1, count + 1)])
+
+
+class TravelProjectListQueriesTest(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.places = create_places(10)
+
+    def create_projects(self, count):
+        offset = TravelProject.objects.count()
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(offset, offset + count):
+                project = TravelProject.objects.create(user=self.user, name=f"Project {i}")
+                TravelProjectPlace.objects.bulk_create([
+                    TravelProjectPlace(project=project, place=place) for place in self.places
+                ])
+
+    def test_list_query_count_does_not_grow_with_projects(self):
+        url = reverse("travel-project-list-list")
+
+        self.create_projects(2)
+        with self.assertNumQueries(2):
+            response = self.client.get(url)
+        self.assertEqual(len(response.data), 2)
+
+        self.create_projects(5)
+        with self.assertNumQueries(2):
+            response = self.client.get(url)
+        self.assertEqual(len(response.data), 7)
+        self.assertEqual(len(response.data[0]["places"]), 10)
+
+    def test_summary_list_is_a_single_query(self):
+        self.create_projects(3)
+        TravelProject.objects.update(place_count=10, visited_count=3)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("travel-project-list-list"), {"summary": "true"})
+        self.assertEqual(len(response.data), 3)
+        self.assertNotIn("places", response.data[0])
+        self.assertEqual((response.data[0]["place_count"], response.data[0]["visited_count"]), (10, 3))
+
+    def test_retrieve_query_count(self):
+        self.create_projects(1)
+        project = TravelProject.objects.get()
+
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse("travel-project-list-detail", args=[project.pk]))
+        self.assertEqual(len(response.data["places"]), 10)
+
+
+class FetchPlacesConcurrentTest(TestCase):
+    TOTAL_PAGES = 5
+
+    def fake_get(self, url, *args, **kwargs):
+        page = int(url.rsplit("page=", 1)[1])
+        response = mock.Mock(status_code=200 if page not in self.failing_pages else 500)
+        response.json.return_value = {
+            "pagination": {"total_pages": self.TOTAL_PAGES},
+            "data": [{"id": page * 10 + i, "title": f"Art {page}-{i}"} for i in range(3)],
+        }
+        return response
+
+    def run_import(self, checkpoint):
+        with mock.patch("requests.Session.get", side_effect=self.fake_get):
+            call_command("fetch_places", concurrent=True, workers=2, checkpoint=str(checkpoint), stdout=mock.Mock())
+
+    def test_import_upserts_all_pages_and_clears_checkpoint(self):
+        self.failing_pages = set()
+        Place.objects.create(id=10, title="Outdated")
+        imported = REGISTRY.get_sample_value("travel_planner_import_places_total", {"source": "api"}) or 0
+
+        with tempfile.TemporaryDirectory() as tmp:
+            checkpoint = Path(tmp) / "checkpoint.json"
+            self.run_import(checkpoint)
+            self.assertFalse(checkpoint.exists())
+
+        self.assertEqual(Place.objects.count(), self.TOTAL_PAGES * 3)
+        self.assertEqual(
+            REGISTRY.get_sample_value("travel_planner_import_places_total", {"source": "api"}),
+            imported + self.TOTAL_PAGES * 3,
+        )
+        self.assertEqual(REGISTRY.get_sample_value("travel_planner_import_last_page"), self.TOTAL_PAGES)
+        self.assertEqual(Place.objects.get(id=10).title, "Art 1-0")
+
+    def test_import_resumes_from_checkpoint(self):
+        self.failing_pages = {4}
+
+        with tempfile.TemporaryDirectory() as tmp:
+            checkpoint = Path(tmp) / "checkpoint.json"
+            with self.assertRaises(CommandError):
+                self.run_import(checkpoint)
+            self.assertEqual(json.loads(checkpoint.read_text())["last_page"], 3)
+
+            self.failing_pages = set()
+            Place.objects.all().delete()
+            self.run_import(checkpoint)
+
+        self.assertEqual(
+            set(Place.objects.values_list("id", flat=True)),
+            {page * 10 + i for page in (4, 5) for i in range(3)},
+        )
+
+
+class FetchPlacesLocalSourceTest(TestCase):
+    def test_import_from_directory_of_pages_and_jsonl(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            source = Path(tmp)
+            (source / "page_1.json").write_text(json.dumps({
+                "pagination": {"total_pages": 1},
+                "data": [{"id": 1, "title": "Art 1"}, {"id": 2, "title": "Art 2"}],
+            }))
+            (source / "page_2.jsonl").write_text("\n".join([
+                json.dumps({"id": 2, "title": "Art 2 (updated)"}),
+                "",
+                json.dumps({"id": 3, "title": "Art 3"}),
+                json.dumps({"data": [{"id": 4, "title": "Art 4"}]}),
+            ]))
+            (source / "notes.txt").write_text("ignored")
+
+            call_command("fetch_places", source=str(source), batch_size=2, stdout=mock.Mock())
+
+        self.assertEqual(
+            dict(Place.objects.values_list("id", "title")),
+            {1: "Art 1", 2: "Art 2 (updated)", 3: "Art 3", 4: "Art 4"},
+        )
+
+    def test_json_list_and_invalid_json_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            source = Path(tmp) / "places.json"
+            source.write_text(json.dumps([{"id": 1, "title": "Art 1"}]))
+            call_command("fetch_places", source=str(source), stdout=mock.Mock())
+
+            source.write_text("42")
+            with self.assertRaises(CommandError):
+                call_command("fetch_places", source=str(source), stdout=mock.Mock())
+
+        self.assertEqual(dict(Place.objects.values_list("id", "title")), {1: "Art 1"})
+
+    def test_missing_source(self):
+        with self.assertRaises(CommandError):
+            call_command("fetch_places", source="/nonexistent/places.jsonl", stdout=mock.Mock())
+
+
+class PlaceListPaginationTest(APITestCase):
+    def setUp(self):
+        super().setUp()
+        create_places(5)
+
+    def test_cursor_pages_through_catalogue_by_id(self):
+        response = self.client.get(reverse("place-list"), {"page_size": 2})
+        self.assertEqual([place["id"] for place in response.data["results"]], [1, 2])
+        self.assertIsNone(response.data["previous"])
+
+        ids = []
+        url = response.data["next"]
+        while url:
+            response = self.client.get(url)
+            ids.extend(place["id"] for place in response.data["results"])
+            url = response.data["next"]
+        self.assertEqual(ids, [3, 4, 5])
+        self.assertIsNotNone(response.data["previous"])
+
+
+class PlaceSearchTest(APITestCase):
+    def setUp(self):
+        super().setUp()
+        Place.objects.bulk_create([
+            Place(id=1, title="The Bedroom"),
+            Place(id=2, title="Bedroom in Arles"),
+            Place(id=3, title="Water Lilies"),
+        ])
+
+    def test_search_ranks_prefix_matches_first(self):
+        response = self.client.get(reverse("place-search"), {"q": "bedroom"})
+        self.assertEqual([place["id"] for place in response.data], [2, 1])
+
+    def test_search_requires_query(self):
+        response = self.client.get(reverse("place-search"))
+        self.assertEqual(response.status_code, 400)
+
+
+class TravelProjectCompletionTest(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.project = TravelProject.objects.create(user=self.user, name="Project")
+        create_places(2)
+        self.first = TravelProjectPlace.objects.create(project=self.project, place_id=1)
+        self.second = TravelProjectPlace.objects.create(project=self.project, place_id=2)
+
+    def assertProject(self, place_count, visited_count, completed):
+        self.project.refresh_from_db()
+        self.assertEqual(
+            (self.project.place_count, self.project.visited_count, self.project.completed),
+            (place_count, visited_count, completed),
+        )
+
+    def test_counters_follow_visited_changes(self):
+        self.assertProject(2, 0, False)
+
+        for tpp in (self.first, self.second):
+            tpp.visited = True
+            tpp.save()
+        self.assertProject(2, 2, True)
+
+        self.first.visited = False
+        self.first.save()
+        self.assertProject(2, 1, False)
+
+        self.first.delete()
+        self.assertProject(1, 1, True)
+
+    def test_stale_instance_does_not_double_count(self):
+        stale = TravelProjectPlace.objects.get(pk=self.first.pk)
+        self.first.visited = True
+        self.first.save()
+
+        stale.visited = True
+        stale.save()
+        self.assertProject(2, 1, False)
+
+    def test_notes_update_skips_project_write(self):
+        url = reverse("travel-project-place-edit-detail", args=[self.first.pk])
+
+        # get_object + update of the place row only.
+        with self.assertNumQueries(2):
+            self.client.patch(url, {"notes": "Bring a camera"})
+
+        # get_object, then the conditional row update and the project counters inside a savepoint.
+        with self.assertNumQueries(5) as queries:
+            self.client.patch(url, {"visited": True, "notes": "Bring a tripod"})
+        place_updates = [q for q in queries.captured_queries if 'UPDATE "travel_projects_travelprojectplace"' in q["sql"]]
+        self.assertEqual(len(place_updates), 1)
+        self.first.refresh_from_db()
+        self.assertEqual((self.first.visited, self.first.notes), (True, "Bring a tripod"))
+        self.assertProject(2, 1, False)
+
+    def test_recount(self):
+        TravelProject.objects.update(place_count=0, visited_count=0, completed=True)
+        TravelProject.objects.recount()
+        self.assertProject(2, 0, False)
+
+
+class TravelProjectPlacesBatchTest(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.project = TravelProject.objects.create(user=self.user, name="Project")
+        create_places(12)
+        for place_id in (1, 2, 3):
+            TravelProjectPlace.objects.create(project=self.project, place_id=place_id)
+        self.url = reverse("travel-project-list-batch-places", args=[self.project.pk])
+
+    def test_batch_applies_all_operations(self):
+        response = self.client.post(self.url, {"add": [4, 5], "remove": [3], "visit": [1, 2, 4, 5]}, format="json")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            dict(TravelProjectPlace.objects.filter(project=self.project).values_list("place_id", "visited")),
+            {1: True, 2: True, 4: True, 5: True},
+        )
+        self.assertTrue(response.data["completed"])
+        self.assertEqual(len(response.data["places"]), 4)
+        self.project.refresh_from_db()
+        self.assertEqual((self.project.place_count, self.project.visited_count), (4, 4))
+
+    def test_batch_is_rejected_as_a_whole(self):
+        cases = [
+            {"add": [1]},
+            {"add": [99]},
+            {"remove": [4]},
+            {"visit": [4]},
+            {"remove": [1], "visit": [1]},
+            {"add": [4, 4]},
+            {"add": list(range(4, 12))},
+        ]
+        for data in cases:
+            with self.subTest(data=data):
+                response = self.client.post(self.url, data, format="json")
+                self.assertEqual(response.status_code, 400)
+
+        self.assertEqual(TravelProjectPlace.objects.filter(project=self.project).count(), 3)
+
+    def test_batch_query_count_is_fixed(self):
+        with self.assertNumQueries(11):
+            self.client.post(self.url, {"add": list(range(4, 11)), "remove": [1], "visit": [2, 3]}, format="json")
+
+
+class ConditionalResponseTest(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.project = TravelProject.objects.create(user=self.user, name="Project")
+        Place.objects.create(id=1, title="Place 1")
+        self.tpp = TravelProjectPlace.objects.create(project=self.project, place_id=1)
+        self.url = reverse("travel-project-list-detail", args=[self.project.pk])
+
+    def test_unchanged_project_returns_not_modified(self):
+        response = self.client.get(self.url)
+        etag = response["ETag"]
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"])
+        self.assertEqual(response.status_code, 304)
+
+    def test_place_update_changes_etag(self):
+        etag = self.client.get(self.url)["ETag"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(
+                reverse("travel-project-place-edit-detail", args=[self.tpp.pk]), {"visited": True}
+            )
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertTrue(response.data["completed"])
+        self.assertTrue(response.data["places"][0]["visited"])
+
+    def test_bumps_within_one_second_get_distinct_versions(self):
+        scope = projects_scope(self.user.pk)
+        with mock.patch("travel_planner.caching.time.time", return_value=1_700_000_000.0):
+            versions = []
+            for _ in range(2):
+                with self.captureOnCommitCallbacks(execute=True):
+                    bump_cache_version(scope)
+                versions.append(get_cache_version(scope))
+
+        self.assertEqual(versions[1][0], versions[0][0] + 1)
+        self.assertEqual(versions[0][1], versions[1][1])
+
+    def test_version_bumped_by_another_process(self):
+        etag = self.client.get(self.url)["ETag"]
+
+        run_in_other_process(
+            "from travel_planner.caching import bump_cache_version, projects_scope; "
+            f"bump_cache_version(projects_scope('{self.user.pk}'))"
+        )
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+
+class AsyncReadEndpointsTest(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.project = TravelProject.objects.create(user=self.user, name="Project")
+        create_places(5)
+        TravelProjectPlace.objects.create(project=self.project, place_id=1)
+        TravelProject.objects.create(user=User.objects.create(email="other@example.com"), name="Other")
+        self.auth = {"Authorization": f"Bearer {RefreshToken.for_user(self.user).access_token}"}
+
+    async def test_project_list_and_detail(self):
+        response = await self.async_client.get(reverse("async-travel-project-list"), headers=self.auth)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([project["name"] for project in response.json()], ["Project"])
+        self.assertEqual(response.json()[0]["places"][0]["place"], 1)
+
+        response = await self.async_client.get(
+            reverse("async-travel-project-list"), {"summary": "1"}, headers=self.auth
+        )
+        self.assertEqual(response.json()[0]["place_count"], 1)
+        self.assertNotIn("places", response.json()[0])
+
+        response = await self.async_client.get(
+            reverse("async-travel-project-detail", args=[self.project.pk]), headers=self.auth
+        )
+        self.assertEqual(response.json()["id"], str(self.project.pk))
+
+    async def test_place_list_pages_both_ways(self):
+        url = reverse("async-place-list")
+        first = (await self.async_client.get(url, {"page_size": 2}, headers=self.auth)).json()
+        self.assertEqual([place["id"] for place in first["results"]], [1, 2])
+        self.assertIsNone(first["previous"])
+
+        second = (await self.async_client.get(first["next"], headers=self.auth)).json()
+        self.assertEqual([place["id"] for place in second["results"]], [3, 4])
+
+        back = (await self.async_client.get(second["previous"], headers=self.auth)).json()
+        self.assertEqual([place["id"] for place in back["results"]], [1, 2])
+
+    async def test_place_cursors_are_shared_with_sync_view(self):
+        sync_next = (await sync_to_async(self.client.get)(reverse("place-list"), {"page_size": 2})).data["next"]
+        query = sync_next.split("?", 1)[1]
+
+        page = (await self.async_client.get(f"{reverse('async-place-list')}?{query}", headers=self.auth)).json()
+        self.assertEqual([place["id"] for place in page["results"]], [3, 4])
+
+        query = page["next"].split("?", 1)[1]
+        response = await sync_to_async(self.client.get)(f"{reverse('place-list')}?{query}")
+        self.assertEqual([place["id"] for place in response.data["results"]], [5])
+
+        response = await self.async_client.get(reverse("async-place-list"), {"cursor": "junk"}, headers=self.auth)
+        self.assertEqual(response.status_code, 404)
+
+    async def test_responses_are_cached_and_revalidated(self):
+        url = reverse("async-travel-project-list")
+        first = await self.async_client.get(url, headers=self.auth)
+        etag = first.headers["ETag"]
+
+        # A queryset update doesn't bump the version, so the cached body is still served.
+        await TravelProject.objects.filter(pk=self.project.pk).aupdate(name="Renamed")
+        cached = await self.async_client.get(url, headers=self.auth)
+        self.assertEqual(cached.content, first.content)
+
+        response = await self.async_client.get(url, headers={**self.auth, "If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+
+        def create_project():
+            with self.captureOnCommitCallbacks(execute=True):
+                TravelProject.objects.create(user=self.user, name="Second")
+
+        await sync_to_async(create_project)()
+        response = await self.async_client.get(url, headers={**self.auth, "If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 2)
+
+    async def test_requires_token(self):
+        response = await self.async_client.get(reverse("async-travel-project-list"))
+        self.assertEqual(response.status_code, 401)
+
+
+class BenchmarkCommandTest(TestCase):
+    def test_benchmark_writes_results(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            output = Path(tmp) / "results.json"
+            call_command(
+                "benchmark",
+                in_place=True,
+                users=2,
+                projects=2,
+                catalogue=20,
+                iterations=2,
+                alloc_iterations=1,
+                endpoints=["project", "place", "profile"],
+                output=str(output),
+                stdout=mock.Mock(),
+            )
+            report = json.loads(output.read_text())
+
+        self.assertEqual(report["meta"]["dataset"]["catalogue"], 20)
+        self.assertIn("project delete", report["results"])
+        self.assertNotIn("login", report["results"])
+        for name, result in report["results"].items():
+            self.assertEqual(result["errors"], 0, name)
+            self.assertEqual(result["requests"], 2)
+
+
+class RequestMetricsMiddlewareTest(APITestCase):
+    def setUp(self):
+        super().setUp()
+        TravelProject.objects.create(user=self.user, name="Project")
+
+    @override_settings(SERVER_TIMING=True)
+    def test_server_timing_header(self):
+        response = self.client.get(reverse("travel-project-list-list"))
+        self.assertRegex(response["Server-Timing"], r'^total;dur=[\d.]+, db;dur=[\d.]+;desc="2 queries, 0 duplicates"$')
+
+    @override_settings(SERVER_TIMING=False)
+    def test_server_timing_can_be_switched_off(self):
+        self.assertNotIn("Server-Timing", self.client.get(reverse("travel-project-list-list")))
+
+    @override_settings(SLOW_REQUEST_QUERIES=2)
+    def test_slow_request_is_logged_with_sql(self):
+        with self.assertLogs("travel_planner.slow_requests", "WARNING") as logs:
+            self.client.get(reverse("travel-project-list-list"))
+
+        entry = json.loads(logs.records[0].getMessage())
+        self.assertEqual(entry["view"], "travel-project-list-list")
+        self.assertEqual(entry["queries"], 2)
+        self.assertIn("travel_projects_travelproject", entry["sql"][0]["sql"] + entry["sql"][1]["sql"])
+
+    async def test_async_views_are_measured(self):
+        token = await sync_to_async(lambda: str(RefreshToken.for_user(self.user).access_token))()
+        response = await self.async_client.get(
+            reverse("async-travel-project-list"), headers={"Authorization": f"Bearer {token}"}
+        )
+        self.assertIn('desc="3 queries', response["Server-Timing"])
+
+    def test_metrics_endpoint(self):
+        labels = {"method": "GET", "route": "travel-project-list-list", "status": "200"}
+        before = REGISTRY.get_sample_value("travel_planner_requests_total", labels) or 0
+
+        self.client.get(reverse("travel-project-list-list"))
+        response = self.client.get(reverse("metrics"))
+
+        self.assertEqual(REGISTRY.get_sample_value("travel_planner_requests_total", labels), before + 1)
+        self.assertIn(b'travel_planner_request_duration_seconds_bucket{le="0.005",method="GET"', response.content)
+        self.assertIn(b'travel_planner_request_db_queries_count{route="travel-project-list-list"}', response.content)
+
+
+    @override_settings(METRICS_TOKEN="secret", METRICS_ALLOWED_IPS=["10.0.0.0/8"])
+    def test_metrics_endpoint_is_not_public(self):
+        url = reverse("metrics")
+        self.assertEqual(self.client.get(url).status_code, 404)
+        self.assertEqual(self.client.get(url, HTTP_X_FORWARDED_FOR="10.0.0.1").status_code, 404)
+        self.assertEqual(self.client.get(url, HTTP_AUTHORIZATION="Bearer wrong").status_code, 404)
+
+        self.assertEqual(self.client.get(url, HTTP_AUTHORIZATION="Bearer secret").status_code, 200)
+        self.assertEqual(self.client.get(url, REMOTE_ADDR="10.1.2.3").status_code, 200)
+
+class QueuedLoggingTest(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.target = logging.handlers.BufferingHandler(capacity=100)
+        self.target.name = "test_target"
+        self.handler = QueuedHandler(handlers=["test_target"], queue_size=2)
+        self.logger = logging.getLogger("travel_planner.tests.queued")
+        self.logger.addHandler(self.handler)
+        self.logger.propagate = False
+
+    def tearDown(self):
+        self.logger.removeHandler(self.handler)
+        self.handler.close()
+
+    def test_records_are_written_on_a_background_thread(self):
+        self.logger.warning("failed login for %s", "user@example.com")
+        self.handler.stop()
+
+        self.assertEqual([record.getMessage() for record in self.target.buffer], ["failed login for user@example.com"])
+
+    def test_full_queue_drops_records_instead_of_blocking(self):
+        self.target.acquire()
+        try:
+            for i in range(10):
+                self.logger.warning("burst %d", i)
+        finally:
+            self.target.release()
+        self.handler.stop()
+
+        self.assertGreater(self.handler.dropped, 0)
+        self.assertEqual(len(self.target.buffer) + self.handler.dropped, 10)
+
+
+class CachedSchemaTest(TestCase):
+    def setUp(self):
+        super().setUp()
+        schema._rendered.clear()
+        schema.generate_schema.cache_clear()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.settings_override = override_settings(OPENAPI_SCHEMA_DIR=Path(self.tmp.name))
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+
+    def test_schema_is_generated_once_and_revalidated_with_etag(self):
+        with mock.patch.object(
+            schema.SchemaView.generator_class, "get_schema", autospec=True,
+            side_effect=schema.SchemaView.generator_class.get_schema,
+        ) as get_schema:
+            response = self.client.get("/swagger.json")
+            self.client.get("/swagger/?format=openapi")
+            self.client.get("/swagger.yaml")
+        self.assertEqual(get_schema.call_count, 1)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("/travel/travel_project/", json.loads(response.content)["paths"])
+        not_modified = self.client.get("/swagger.json", headers={"If-None-Match": response["ETag"]})
+        self.assertEqual(not_modified.status_code, 304)
+
+    def test_schema_is_served_from_generated_files(self):
+        call_command("generate_openapi_schema", stdout=mock.Mock())
+        (Path(self.tmp.name) / "schema.json").write_text('{"swagger": "2.0", "paths": {}}')
+
+        response = self.client.get("/swagger.json")
+        self.assertEqual(json.loads(response.content), {"swagger": "2.0", "paths": {}})
+        self.assertTrue((Path(self.tmp.name) / "schema.yaml").exists())
+
+
+class PrimaryKeyTest(TestCase):
+    def test_new_keys_are_time_ordered(self):
+        user = User.objects.create(email="user@example.com")
+        first = TravelProject.objects.create(user=user, name="First")
+        time.sleep(0.002)
+        second = TravelProject.objects.create(user=user, name="Second")
+
+        self.assertEqual(first.pk.version, 7)
+        self.assertEqual(user.pk.version, 7)
+        self.assertLess(first.pk, second.pk)
+
+
+class BenchmarkPrimaryKeysTest(TransactionTestCase):
+    # Creating tables needs the schema editor, which SQLite refuses inside TestCase's transaction.
+    def test_benchmark_primary_keys(self):
+        stdout = io.StringIO()
+        call_command("benchmark_primary_keys", parents=20, children_per_parent=5, batch_size=30, joins=5, json=True, stdout=stdout)
+
+        results = json.loads(stdout.getvalue()[stdout.getvalue().index("{"):])
+        self.assertEqual(set(results), {"uuid4", "uuid7", "bigint"})
+        self.assertEqual(results["uuid7"]["rows"], 100)
+
+
+class QueryPlanTest(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create(email="user@example.com")
+        self.project = TravelProject.objects.create(user=self.user, name="Project")
+        create_places(3)
+        TravelProjectPlace.objects.bulk_create([
+            TravelProjectPlace(project=self.project, place_id=i, visited=i == 1) for i in range(1, 4)
+        ])
+
+    def explain(self, queryset):
+        if connection.vendor == "postgresql":
+            # The test tables are tiny; make the planner show which index it would use.
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+        return queryset.explain()
+
+    def assertNoSort(self, plan):
+        self.assertNotRegex(plan, r"TEMP B-TREE|Sort")
+
+    def test_project_list_reads_user_index_in_order(self):
+        plan = self.explain(TravelProject.objects.filter(user_id=self.user.pk))
+        self.assertIn("travelproject_user_created_idx", plan)
+        self.assertNoSort(plan)
+
+    def test_project_places_prefetch_uses_unique_index(self):
+        plan = self.explain(TravelProjectPlace.objects.filter(project_id__in=[self.project.pk]))
+        self.assertIn("project_id_place_id", plan)
+
+    def test_unvisited_lookup_uses_partial_index(self):
+        plan = self.explain(TravelProjectPlace.objects.filter(project=self.project, visited=False))
+        self.assertIn("tpp_project_unvisited_idx", plan)
+
+    def test_place_admin_list_reads_created_index_in_order(self):
+        plan = self.explain(Place.objects.all()[:100])
+        self.assertIn("place_created_idx", plan)
+        self.assertNoSort(plan)
+
+
+class PlaceCatalogueTest(APITestCase):
+    def setUp(self):
+        super().setUp()
+        create_places(10)
+
+    def place_queries(self, queries):
+        return [q["sql"] for q in queries if 'FROM "travel_projects_place"' in q["sql"]]
+
+    def test_create_and_add_place_without_catalogue_queries(self):
+        get_catalogue()
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                reverse("travel-project-list-list"), {"name": "Trip", "places": list(range(1, 11))}, format="json"
+            )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.place_queries(queries), [])
+        project = TravelProject.objects.get()
+        self.assertEqual(project.travelprojectplace_set.count(), 10)
+
+        project.travelprojectplace_set.filter(place_id=10).delete()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse("add-place"), {"project": project.pk, "place": 10})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.place_queries(queries), [])
+
+    def test_places_created_after_loading_are_looked_up(self):
+        get_catalogue()
+        Place.objects.create(id=11, title="Place 11")
+
+        self.assertEqual(missing_place_ids([1, 11, 12]), {12})
+
+    def test_delete_and_import_reload_the_catalogue(self):
+        self.assertIn(1, get_catalogue())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Place.objects.filter(id=1).delete()
+        self.assertNotIn(1, get_catalogue())
+
+        version = get_catalogue_version()
+        with tempfile.TemporaryDirectory() as tmp:
+            (Path(tmp) / "places.jsonl").write_text(json.dumps({"id": 1, "title": "Place 1"}))
+            with self.captureOnCommitCallbacks(execute=True):
+                call_command("fetch_places", source=tmp, stdout=mock.Mock())
+        self.assertNotEqual(get_catalogue_version(), version)
+        self.assertIn(1, get_catalogue())
+
+    def test_version_bumped_by_another_process(self):
+        self.assertIn(1, get_catalogue())
+        # A queryset update bypasses the signals, so only the other process's bump tells this one.
+        Place.objects.filter(id=1).update(id=100)
+        self.assertIn(1, get_catalogue())
+
+        run_in_other_process("from travel_projects.catalogue import bump_catalogue_version; bump_catalogue_version()")
+
+        catalogue = get_catalogue()
+        self.assertNotIn(1, catalogue)
+        self.assertIn(100, catalogue)
+
+
+class TravelProjectCreateTest(APITestCase):
+    def setUp(self):
+        super().setUp()
+        create_places(10)
+        get_catalogue()
+
+    def create(self, name, places):
+        return self.client.post(reverse("travel-project-list-list"), {"name": name, "places": places}, format="json")
+
+    def test_create_inserts_without_reading_back(self):
+        # The project INSERT and one bulk INSERT of its places, inside a savepoint here
+        # (a transaction outside tests).
+        with self.assertNumQueries(4):
+            response = self.create("Trip", list(range(1, 11)))
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([place["place"] for place in response.data["places"]], list(range(1, 11)))
+        self.assertEqual(TravelProject.objects.get().place_count, 10)
+
+    def test_duplicate_name_is_rejected_by_the_insert(self):
+        self.create("Trip", [1])
+
+        response = self.create("Trip", [2])
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("name", response.data)
+        self.assertEqual(TravelProjectPlace.objects.count(), 1)
+
+
+class AddPlaceTest(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.project = TravelProject.objects.create(user=self.user, name="Trip")
+        create_places(11)
+        get_catalogue()
+
+    def add(self, place_id):
+        return self.client.post(reverse("add-place"), {"project": self.project.pk, "place": place_id})
+
+    def test_add_place_checks_nothing_up_front(self):
+        # Project lookup, then savepoint, INSERT, counter UPDATE, row count, release.
+        with self.assertNumQueries(6):
+            response = self.add(1)
+        self.assertEqual(response.status_code, 201)
+
+    def test_duplicate_and_full_project_are_rejected(self):
+        self.add(1)
+        response = self.add(1)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data, ["This place is already in the project."])
+
+        for place_id in range(2, 11):
+            self.add(place_id)
+        response = self.add(11)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data, ["A project can contain at most 10 places."])
+
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.place_count, 10)
+        self.assertEqual(self.project.travelprojectplace_set.count(), 10)
+
+    def test_deleting_a_place_recounts_its_projects(self):
+        for place_id in range(1, 11):
+            self.add(place_id)
+        TravelProjectPlace.objects.filter(project=self.project, place_id=2).update(visited=True)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Place.objects.filter(id__in=[1, 2]).delete()
+        self.project.refresh_from_db()
+        self.assertEqual((self.project.place_count, self.project.visited_count), (8, 0))
+
+        self.assertEqual(self.add(11).status_code, 201)
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.place_count, 9)
+
+
+@skipUnless(connection.vendor == "postgresql", "needs concurrent transactions; run with a PostgreSQL DATABASE_URL")
+class AddPlaceConcurrencyTest(TransactionTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create(email="user@example.com")
+        self.project = TravelProject.objects.create(user=self.user, name="Trip")
+        create_places(20)
+
+    def test_parallel_adds_keep_the_cap_and_fail_cleanly(self):
+        # 20 different places and 10 repeats, all sent at the same moment.
+        place_ids = [*range(1, 21), *range(1, 11)]
+        barrier = threading.Barrier(len(place_ids))
+
+        def add(place_id):
+            client = APIClient()
+            client.force_authenticate(self.user)
+            try:
+                barrier.wait()
+                return client.post(reverse("add-place"), {"project": self.project.pk, "place": place_id}).status_code
+            finally:
+                connections.close_all()
+
+        with ThreadPoolExecutor(max_workers=len(place_ids)) as pool:
+            statuses = list(pool.map(add, place_ids))
+
+        self.assertEqual(statuses.count(201), 10)
+        self.assertEqual(statuses.count(400), len(place_ids) - 10)
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.place_count, 10)
+        self.assertEqual(self.project.travelprojectplace_set.count(), 10)
+
+
+class SparseFieldsetTest(APITestCase):
+    def setUp(self):
+        super().setUp()
+        create_places(3)
+        self.project = TravelProject.objects.create(user=self.user, name="Trip")
+        self.tpp = TravelProjectPlace.objects.create(project=self.project, place_id=1, notes="Go early")
+
+    def test_fields_skip_the_places_prefetch(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("travel-project-list-list"), {"fields": "id,name"})
+        self.assertEqual(list(response.data[0]), ["id", "name"])
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn("description", queries[0]["sql"])
+
+    def test_expand_place_in_project_list(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                reverse("travel-project-list-list"), {"fields": "id,places.place.title", "expand": "place"}
+            )
+        self.assertEqual(response.data[0]["places"], [{"place": {"title": "Place 1"}}])
+        self.assertEqual(len(queries), 2)
+        self.assertIn('JOIN "travel_projects_place"', queries[1]["sql"])
+        self.assertNotIn("notes", queries[1]["sql"])
+
+    def test_expanded_places_follow_place_changes(self):
+        url = reverse("travel-project-list-detail", args=[self.project.pk])
+        expanded = self.client.get(url, {"expand": "place"})
+        plain_etag = self.client.get(url)["ETag"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            place = Place.objects.get(id=1)
+            place.title = "Renamed"
+            place.save()
+
+        response = self.client.get(url, {"expand": "place"}, HTTP_IF_NONE_MATCH=expanded["ETag"])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["places"][0]["place"]["title"], "Renamed")
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=plain_etag).status_code, 304)
+
+    def test_expand_place_on_project_place(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                reverse("travel-project-place-edit-detail", args=[self.tpp.pk]), {"expand": "place"}
+            )
+        self.assertEqual(response.data["place"]["title"], "Place 1")
+        self.assertEqual(response.data["notes"], "Go early")
+
+    def test_place_list_fields(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("place-list"), {"fields": "id,title"})
+        self.assertEqual(response.data["results"][0], {"id": 1, "title": "Place 1"})
+        self.assertNotIn("created_at", queries[0]["sql"])
+
+    def test_writes_ignore_fields(self):
+        response = self.client.patch(
+            reverse("travel-project-list-detail", args=[self.project.pk]) + "?fields=id", {"name": "Renamed"}
+        )
+        self.assertEqual(response.data["name"], "Renamed")
@@ -1,7 +1,7 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 
-from . import views
+from . import async_views, views
 
 router = DefaultRouter()
 
@@ -11,5 +11,8 @@ router.register("place", views.PlaceViewSet, basename="place")
 
 urlpatterns = [
     path("add_place/", views.TravelProjectAddPlaceView.as_view(), name="add-place"),
+    path("async/travel_project/", async_views.travel_project_list, name="async-travel-project-list"),
+    path("async/travel_project/<uuid:pk>/", async_views.travel_project_detail, name="async-travel-project-detail"),
+    path("async/place/", async_views.place_list, name="async-place-list"),
     path("", include(router.urls))
 ]
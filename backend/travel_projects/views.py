@@ -1,32 +1,89 @@
+from functools import partial
+
+from django.db import transaction
 from rest_framework import status
+from rest_framework.decorators import action
 from rest_framework.viewsets import GenericViewSet
 from rest_framework.exceptions import ValidationError
 from rest_framework.generics import GenericAPIView
 from rest_framework.mixins import ListModelMixin, CreateModelMixin, RetrieveModelMixin, DestroyModelMixin, UpdateModelMixin
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import SAFE_METHODS, IsAuthenticated
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 
+from travel_planner.caching import PLACES_SCOPE, ConditionalResponseMixin, projects_scope
+
 from .models import TravelProject, Place, TravelProjectPlace
+from .pagination import PlaceCursorPagination
 
 from .serializers import (
     TravelProjectSerializer,
+    TravelProjectSummarySerializer,
     TravelProjectCreateSerializer,
     TravelProjectAddPlaceSerializer,
     TravelProjectPlaceSerializer,
+    TravelProjectPlacesBatchSerializer,
     PlaceSerializer,
+    sparse_fieldset_kwargs,
+    wants_summary,
+)
+
+FIELDS_PARAMETER = openapi.Parameter(
+    "fields",
+    openapi.IN_QUERY,
+    description="Comma separated fields to return; nested fields with dots, e.g. id,name,places.visited",
+    type=openapi.TYPE_STRING,
 )
+EXPAND_PARAMETER = openapi.Parameter(
+    "expand",
+    openapi.IN_QUERY,
+    description="place to return places as objects instead of ids",
+    type=openapi.TYPE_STRING,
+)
+
+class SparseFieldsetViewMixin:
+    """
+    Passes ?fields= and ?expand= to the serializer on reads; optimize_queryset() then
+    loads only what that serializer renders.
+    """
+
+    def get_serializer(self, *args, **kwargs):
+        if self.request.method in SAFE_METHODS:
+            kwargs.update(sparse_fieldset_kwargs(self.request.query_params))
+        return super().get_serializer(*args, **kwargs)
+
+    def optimize_queryset(self, queryset):
+        return self.get_serializer().optimize_queryset(queryset)
 
-class TravelProjectViewSet(ListModelMixin, RetrieveModelMixin, UpdateModelMixin, CreateModelMixin, DestroyModelMixin, GenericViewSet):
+class TravelProjectViewSet(SparseFieldsetViewMixin, ConditionalResponseMixin, ListModelMixin, RetrieveModelMixin, UpdateModelMixin, CreateModelMixin, DestroyModelMixin, GenericViewSet):
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        return TravelProject.objects.filter(user=self.request.user)
+        if getattr(self, "swagger_fake_view", False):
+            # Schema generation runs without a request.
+            return TravelProject.objects.none()
+        queryset = TravelProject.objects.filter(user_id=self.request.user.pk)
+        if self.action in ("list", "retrieve"):
+            queryset = self.optimize_queryset(queryset)
+        elif self.action == "batch_places":
+            queryset = queryset.select_for_update()
+        return queryset
+
+    def get_cache_scope(self):
+        scope = projects_scope(self.request.user.pk)
+        if "place" in sparse_fieldset_kwargs(self.request.query_params)["expand"]:
+            # Expanded places carry their titles, which change with the places scope.
+            return scope, PLACES_SCOPE
+        return scope
 
     def get_serializer_class(self):
         if self.action == "create":
             return TravelProjectCreateSerializer
+        if self.action == "list" and wants_summary(self.request.query_params):
+            return TravelProjectSummarySerializer
+        if self.action == "batch_places":
+            return TravelProjectPlacesBatchSerializer
         return TravelProjectSerializer
     
     def perform_destroy(self, instance):
@@ -51,18 +108,26 @@ class TravelProjectViewSet(ListModelMixin, RetrieveModelMixin, UpdateModelMixin,
                 type=openapi.TYPE_STRING,
                 required=True,
                 example="Bearer your_jwt_token_here",
-            )
+            ),
+            openapi.Parameter(
+                "summary",
+                openapi.IN_QUERY,
+                description="true to return place_count/visited_count instead of the places",
+                type=openapi.TYPE_BOOLEAN,
+            ),
+            FIELDS_PARAMETER,
+            EXPAND_PARAMETER,
         ],
     )
     def list(self, request, *args, **kwargs):
-        return super().list(request, *args, **kwargs)
+        return self.cached_response(request, partial(super().list, request, *args, **kwargs))
     
     @swagger_auto_schema(
         operation_summary="Create Travel Project",
         operation_description="Create travel project",
         request_body=TravelProjectCreateSerializer,
         responses={
-            201: TravelProjectCreateSerializer,
+            201: TravelProjectSerializer,
             401: "Unauthorized - Invalid or missing token",
         },
         tags=["TravelProject"],
@@ -96,11 +161,13 @@ class TravelProjectViewSet(ListModelMixin, RetrieveModelMixin, UpdateModelMixin,
                 type=openapi.TYPE_STRING,
                 required=True,
                 example="Bearer your_jwt_token_here",
-            )
+            ),
+            FIELDS_PARAMETER,
+            EXPAND_PARAMETER,
         ],
     )
     def retrieve(self, request, *args, **kwargs):
-        return super().retrieve(request, *args, **kwargs)
+        return self.cached_response(request, partial(super().retrieve, request, *args, **kwargs))
     
     @swagger_auto_schema(
         operation_summary="Update Travel Project",
@@ -170,6 +237,37 @@ class TravelProjectViewSet(ListModelMixin, RetrieveModelMixin, UpdateModelMixin,
     def destroy(self, request, *args, **kwargs):
         return super().destroy(request, *args, **kwargs)
 
+    @swagger_auto_schema(
+        operation_summary="Batch Update Travel Project Places",
+        operation_description="Add, remove and mark places visited in one request",
+        request_body=TravelProjectPlacesBatchSerializer,
+        responses={
+            200: TravelProjectSerializer,
+            400: "Bad Request - Invalid operations",
+            401: "Unauthorized - Invalid or missing token",
+        },
+        tags=["TravelProject"],
+        manual_parameters=[
+            openapi.Parameter(
+                "Authorization",
+                openapi.IN_HEADER,
+                description="JWT token with Bearer prefix (Bearer <token>)",
+                type=openapi.TYPE_STRING,
+                required=True,
+                example="Bearer your_jwt_token_here",
+            )
+        ],
+    )
+    @action(detail=True, methods=["post"], url_path="places/batch")
+    def batch_places(self, request, pk=None):
+        # The project row stays locked while the operations are validated and applied.
+        with transaction.atomic():
+            project = self.get_object()
+            serializer = self.get_serializer(project, data=request.data)
+            serializer.is_valid(raise_exception=True)
+            result = serializer.apply()
+        return Response(result, status=status.HTTP_200_OK)
+
 class TravelProjectAddPlaceView(GenericAPIView):
     permission_classes = [IsAuthenticated]
     serializer_class = TravelProjectAddPlaceSerializer
@@ -200,7 +298,7 @@ class TravelProjectAddPlaceView(GenericAPIView):
         result = serializer.add_place()
         return Response(result, status=status.HTTP_201_CREATED)
     
-class TravelProjectPlaceViewSet(RetrieveModelMixin, UpdateModelMixin, GenericViewSet):
+class TravelProjectPlaceViewSet(SparseFieldsetViewMixin, RetrieveModelMixin, UpdateModelMixin, GenericViewSet):
     permission_classes = [IsAuthenticated]
     serializer_class = TravelProjectPlaceSerializer
 
@@ -220,7 +318,9 @@ class TravelProjectPlaceViewSet(RetrieveModelMixin, UpdateModelMixin, GenericVie
                 type=openapi.TYPE_STRING,
                 required=True,
                 example="Bearer your_jwt_token_here",
-            )
+            ),
+            FIELDS_PARAMETER,
+            EXPAND_PARAMETER,
         ],
     )
     def retrieve(self, request, *args, **kwargs):
@@ -273,12 +373,28 @@ class TravelProjectPlaceViewSet(RetrieveModelMixin, UpdateModelMixin, GenericVie
         return super().partial_update(request, *args, **kwargs)
     
     def get_queryset(self):
-        return TravelProjectPlace.objects.filter(project__user=self.request.user)
+        if getattr(self, "swagger_fake_view", False):
+            return TravelProjectPlace.objects.none()
+        queryset = TravelProjectPlace.objects.filter(project__user_id=self.request.user.pk)
+        if self.action == "retrieve":
+            return self.optimize_queryset(queryset)
+        # Saving bumps the owner's cache version, which reads project.user_id.
+        return queryset.select_related("project")
     
-class PlaceViewSet(ListModelMixin, GenericViewSet):
+SEARCH_LIMIT = 20
+SEARCH_MAX_LIMIT = 100
+
+class PlaceViewSet(SparseFieldsetViewMixin, ConditionalResponseMixin, ListModelMixin, GenericViewSet):
     permission_classes = [IsAuthenticated]
     serializer_class = PlaceSerializer
     queryset = Place.objects.all()
+    pagination_class = PlaceCursorPagination
+
+    def get_queryset(self):
+        return self.optimize_queryset(super().get_queryset())
+
+    def get_cache_scope(self):
+        return PLACES_SCOPE
 
     @swagger_auto_schema(
         operation_summary="List Places",
@@ -296,8 +412,61 @@ class PlaceViewSet(ListModelMixin, GenericViewSet):
                 type=openapi.TYPE_STRING,
                 required=True,
                 example="Bearer your_jwt_token_here",
-            )
+            ),
+            FIELDS_PARAMETER,
         ],
     )
     def list(self, request, *args, **kwargs):
-        return super().list(request, *args, **kwargs)
\ No newline at end of file
+        return self.cached_response(request, partial(super().list, request, *args, **kwargs))
+
+    @swagger_auto_schema(
+        operation_summary="Search Places",
+        operation_description="Search places by title, best matches first",
+        responses={
+            200: PlaceSerializer(many=True),
+            400: "Bad Request - Missing search query",
+            401: "Unauthorized - Invalid or missing token",
+        },
+        tags=["TravelProject"],
+        manual_parameters=[
+            openapi.Parameter(
+                "Authorization",
+                openapi.IN_HEADER,
+                description="JWT token with Bearer prefix (Bearer <token>)",
+                type=openapi.TYPE_STRING,
+                required=True,
+                example="Bearer your_jwt_token_here",
+            ),
+            openapi.Parameter(
+                "q",
+                openapi.IN_QUERY,
+                description="Title or part of a title to search for",
+                type=openapi.TYPE_STRING,
+                required=True,
+            ),
+            openapi.Parameter(
+                "limit",
+                openapi.IN_QUERY,
+                description=f"Maximum number of results (default {SEARCH_LIMIT}, max {SEARCH_MAX_LIMIT})",
+                type=openapi.TYPE_INTEGER,
+            ),
+            FIELDS_PARAMETER,
+        ],
+    )
+    @action(detail=False, methods=["get"])
+    def search(self, request):
+        query = request.query_params.get("q", "").strip()
+        if not query:
+            raise ValidationError({"q": "This query parameter is required."})
+
+        try:
+            limit = min(int(request.query_params.get("limit", SEARCH_LIMIT)), SEARCH_MAX_LIMIT)
+        except ValueError:
+            raise ValidationError({"limit": "A valid integer is required."})
+
+        return self.cached_response(request, partial(self._search, query, max(limit, 1)))
+
+    def _search(self, query, limit):
+        places = self.optimize_queryset(Place.objects.search(query))[:limit]
+        serializer = self.get_serializer(places, many=True)
+        return Response(serializer.data, status=status.HTTP_200_OK)
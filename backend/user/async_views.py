@@ -0,0 +1,24 @@
+from functools import partial
+
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
+
+from travel_planner.caching import cached_async_response, profile_scope
+
+from .authentication import async_jwt_required
+from .models import User
+from .serializers import UserProfileSerializer
+
+
+@require_GET
+@async_jwt_required
+async def profile(request):
+    return await cached_async_response(request, profile_scope(request.user.pk), partial(_profile, request))
+
+
+async def _profile(request):
+    user = request.user
+    if not isinstance(user, User):
+        # Stateless tokens only carry the id, the profile needs the full row.
+        user = await User.objects.aget(pk=user.pk)
+    return JsonResponse(UserProfileSerializer(user).data)
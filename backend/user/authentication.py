@@ -0,0 +1,126 @@
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import JsonResponse
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+
+def user_cache_key(user_id):
+    return f"auth:user:{user_id}"
+
+
+def user_cache_entry(user):
+    """
+    What the cache keeps of a user: its fields without the password hash, and only the
+    digest of that hash that CHECK_REVOKE_TOKEN compares against.
+    """
+    fields = {field.attname: getattr(user, field.attname) for field in user._meta.concrete_fields if field.attname != "password"}
+    digest = get_md5_hash_password(user.password) if api_settings.CHECK_REVOKE_TOKEN else None
+    return fields, digest
+
+
+def user_from_cache_entry(model, entry):
+    # The password stays deferred: it is loaded from the database only if something reads it.
+    fields, digest = entry
+    return model.from_db(None, list(fields), list(fields.values())), digest
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that keeps resolved users in the cache for AUTH_USER_CACHE_TIMEOUT
+    seconds instead of loading them on every request. The password hash is never cached.
+    Entries are dropped when a save or delete of the user commits (see user.signals). With JWT_STATELESS_AUTH the user is built
+    from the token claims alone and the database is never queried.
+    """
+
+    def get_user(self, validated_token):
+        if settings.JWT_STATELESS_AUTH:
+            return self.get_token_user(validated_token)
+
+        key = user_cache_key(self.get_user_id(validated_token))
+        entry = cache.get(key)
+        if entry is None:
+            user = super().get_user(validated_token)
+            cache.set(key, user_cache_entry(user), settings.AUTH_USER_CACHE_TIMEOUT)
+            return user
+
+        user, digest = user_from_cache_entry(self.user_model, entry)
+        self.check_user(user, validated_token, digest)
+        return user
+
+    async def aauthenticate(self, request):
+        """Async counterpart of authenticate() for views running on the ASGI event loop."""
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
+
+    async def aget_user(self, validated_token):
+        if settings.JWT_STATELESS_AUTH:
+            return self.get_token_user(validated_token)
+
+        user_id = self.get_user_id(validated_token)
+        key = user_cache_key(user_id)
+        entry = await cache.aget(key)
+        if entry is None:
+            try:
+                user = await self.user_model.objects.aget(**{api_settings.USER_ID_FIELD: user_id})
+            except self.user_model.DoesNotExist:
+                raise AuthenticationFailed("User not found", code="user_not_found")
+            self.check_user(user, validated_token)
+            await cache.aset(key, user_cache_entry(user), settings.AUTH_USER_CACHE_TIMEOUT)
+            return user
+
+        user, digest = user_from_cache_entry(self.user_model, entry)
+        self.check_user(user, validated_token, digest)
+        return user
+
+    def get_user_id(self, validated_token):
+        try:
+            return validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken("Token contained no recognizable user identification")
+
+    def get_token_user(self, validated_token):
+        self.get_user_id(validated_token)
+        return api_settings.TOKEN_USER_CLASS(validated_token)
+
+    def check_user(self, user, validated_token, password_digest=None):
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed("User is inactive", code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if password_digest is None:
+                password_digest = get_md5_hash_password(user.password)
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != password_digest:
+                raise AuthenticationFailed("The user's password has been changed.", code="password_changed")
+
+
+def async_jwt_required(view):
+    """Authenticate an async view like IsAuthenticated + CachedJWTAuthentication do for DRF views."""
+
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        try:
+            result = await CachedJWTAuthentication().aauthenticate(request)
+        except (InvalidToken, AuthenticationFailed) as error:
+            detail = error.detail if isinstance(error.detail, dict) else {"detail": error.detail}
+            return JsonResponse(detail, status=401)
+
+        if result is None:
+            return JsonResponse({"detail": "Authentication credentials were not provided."}, status=401)
+
+        request.user, request.auth = result
+        return await view(request, *args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.contrib.auth import hashers
+
+# Cost parameters come from settings so each environment can pick its own trade-off
+# between login latency and brute-force cost. The algorithm names are Django's, so stored
+# hashes keep verifying; when a hash was made with other parameters (or by the other
+# hasher) it is upgraded the next time its user logs in.
+
+
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    @property
+    def iterations(self):
+        return settings.PASSWORD_PBKDF2_ITERATIONS or super().iterations
+
+
+class Argon2PasswordHasher(hashers.Argon2PasswordHasher):
+    @property
+    def time_cost(self):
+        return settings.ARGON2_TIME_COST or super().time_cost
+
+    @property
+    def memory_cost(self):
+        return settings.ARGON2_MEMORY_COST or super().memory_cost
+
+    @property
+    def parallelism(self):
+        return settings.ARGON2_PARALLELISM or super().parallelism
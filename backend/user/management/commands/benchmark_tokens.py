@@ -0,0 +1,52 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand
+
+from ...models import User
+from ...serializers import UserRegisterSerializer
+from ...tokens import issue_tokens
+
+
+def one_by_one(users):
+    for user in users:
+        issue_tokens(user)
+
+
+def rendered_twice(users):
+    # Rendering the same serializer again reuses its pair, so this signs one pair per user.
+    for user in users:
+        serializer = UserRegisterSerializer(user)
+        serializer.to_representation(user)
+        serializer.to_representation(user)
+
+
+class Command(BaseCommand):
+    help = "Measure how many refresh/access token pairs per second issue_tokens produces"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=10_000)
+        parser.add_argument("--rounds", type=int, default=3, help="Best of this many runs is reported")
+        parser.add_argument("--json", action="store_true", help="Print results as JSON")
+
+    def handle(self, *args, **options):
+        # Unsaved users: issuing tokens needs nothing but the id.
+        users = [User(email=f"token-bench-{i}@example.com") for i in range(options["users"])]
+
+        results = {}
+        for name, issue in (("issue_tokens", one_by_one), ("serializer rendered twice", rendered_twice)):
+            best = min(self.timed(issue, users) for _ in range(options["rounds"]))
+            results[name] = {"pairs_per_s": len(users) / best, "tokens_per_s": 2 * len(users) / best}
+
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+
+        self.stdout.write(f"{'issuer':<28}{'pairs/s':>10}{'tokens/s':>10}")
+        for name, result in results.items():
+            self.stdout.write(f"{name:<28}{result['pairs_per_s']:>10.0f}{result['tokens_per_s']:>10.0f}")
+
+    def timed(self, issue, users):
+        started = time.perf_counter()
+        issue(users)
+        return time.perf_counter() - started
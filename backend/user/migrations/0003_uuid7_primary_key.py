@@ -0,0 +1,21 @@
+# Generated by Django 6.0.2 on 2026-10-18 18:52
+
+import travel_planner.ids
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0002_updated_at_auto_now'),
+    ]
+
+    # Only the default changes: existing rows keep their uuid4 keys (still valid UUIDs, so
+    # URLs and foreign keys are untouched) and new rows get time-ordered uuid7 keys.
+    operations = [
+        migrations.AlterField(
+            model_name='user',
+            name='id',
+            field=models.UUIDField(default=travel_planner.ids.uuid7, primary_key=True, serialize=False),
+        ),
+    ]
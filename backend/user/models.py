@@ -1,15 +1,15 @@
-import uuid
-
 from django.utils import timezone
 from django.db import models
 from django.contrib.auth.models import AbstractUser
 
+from travel_planner.ids import uuid7
+
 class User(AbstractUser):
     username = None
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, unique=True)
+    id = models.UUIDField(primary_key=True, default=uuid7)
     email = models.EmailField(unique=True)
     created_at = models.DateTimeField(default=timezone.now)
-    updated_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = ["first_name", "last_name"]
\ No newline at end of file
@@ -4,13 +4,13 @@ from django.contrib.auth.password_validation import validate_password
 from django.contrib.auth import authenticate
 from django.core.exceptions import ValidationError
 from rest_framework import serializers
-from rest_framework_simplejwt.tokens import RefreshToken
 
 from .models import User
+from .tokens import TokenIssuingMixin
 
 LOGGER = logging.getLogger(__name__)
 
-class UserRegisterSerializer(serializers.ModelSerializer):
+class UserRegisterSerializer(TokenIssuingMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ["email", "password", "first_name", "last_name"]
@@ -47,16 +47,15 @@ class UserRegisterSerializer(serializers.ModelSerializer):
     
     def to_representation(self, instance):
         user = super().to_representation(instance)
-        refresh = RefreshToken.for_user(instance)
-        access = refresh.access_token
+        tokens = self.get_tokens(instance)
 
         return {
             "user": user,
-            "refresh": str(refresh),
-            "access": str(access),
+            "refresh": tokens.refresh,
+            "access": tokens.access,
         }
     
-class UserLoginSerializer(serializers.Serializer):
+class UserLoginSerializer(TokenIssuingMixin, serializers.Serializer):
     email = serializers.EmailField()
     password = serializers.CharField()
 
@@ -79,8 +78,7 @@ class UserLoginSerializer(serializers.Serializer):
     
     def user_tokens(self):
         user = self.validated_data.get("user")
-        refresh = RefreshToken.for_user(user)
-        access = refresh.access_token
+        tokens = self.get_tokens(user)
 
         return {
             "user": {
@@ -89,8 +87,8 @@ class UserLoginSerializer(serializers.Serializer):
                 "first_name": user.first_name,
                 "last_name": user.last_name
             },
-            "refresh_token": str(refresh),
-            "access_token": str(access)
+            "refresh_token": tokens.refresh,
+            "access_token": tokens.access
         }
 
 class UserProfileSerializer(serializers.ModelSerializer):
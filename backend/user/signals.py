@@ -0,0 +1,18 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from travel_planner.caching import bump_cache_version, profile_scope
+
+from .authentication import user_cache_key
+from .models import User
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    # After the commit, or a request running meanwhile could cache the old row again.
+    key = user_cache_key(instance.pk)
+    transaction.on_commit(lambda: cache.delete(key))
+    bump_cache_version(profile_scope(instance.pk))
@@ -1,3 +1,178 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import cache
+from django.test import RequestFactory, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from travel_planner.base_testcases import TestCase
+
+from .authentication import user_cache_key
+from .models import User
+from .serializers import UserRegisterSerializer
+from .throttling import _failure_keys
+from .tokens import issue_tokens
+
+
+class CachedJWTAuthenticationTest(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create(email="user@example.com", first_name="Jane", last_name="Doe")
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(self.user).access_token}")
+
+    def test_user_is_loaded_once(self):
+        with self.assertNumQueries(1):
+            self.client.get(reverse("profile"))
+
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("profile"), HTTP_IF_NONE_MATCH="*")
+        self.assertEqual(response.status_code, 304)
+
+    def test_save_invalidates_cached_user(self):
+        self.client.get(reverse("profile"))
+
+        self.user.is_active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+
+        response = self.client.get(reverse("profile"))
+        self.assertEqual(response.status_code, 401)
+
+    def test_cached_user_leaves_out_the_password_hash(self):
+        self.user.set_password("correct horse")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+        self.client.get(reverse("profile"))
+
+        fields, _ = cache.get(user_cache_key(self.user.pk))
+        self.assertEqual(fields["email"], "user@example.com")
+        self.assertNotIn("password", fields)
+        self.assertNotIn(self.user.password, repr(cache.get(user_cache_key(self.user.pk))))
+
+    @override_settings(JWT_STATELESS_AUTH=True)
+    def test_stateless_mode_skips_user_lookup(self):
+        # Only the project query itself, no user lookup.
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("travel-project-list-list"))
+        self.assertEqual(response.status_code, 200)
+
+        response = self.client.get(reverse("profile"))
+        self.assertEqual(response.data["email"], "user@example.com")
+
+
+@override_settings(LOGIN_FAILURES_PER_ACCOUNT=3, LOGIN_FAILURES_PER_IP=5)
+class LoginThrottleTest(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create(email="user@example.com")
+        self.user.set_password("correct horse")
+        self.user.save()
+        self.client = APIClient()
+
+    def login(self, password, email="user@example.com"):
+        return self.client.post(reverse("login"), {"email": email, "password": password}, format="json")
+
+    def test_account_is_locked_without_hashing(self):
+        for _ in range(3):
+            self.assertEqual(self.login("wrong").status_code, 400)
+
+        with mock.patch("user.serializers.authenticate") as authenticate:
+            response = self.login("correct horse")
+        self.assertEqual(response.status_code, 429)
+        authenticate.assert_not_called()
+
+    def test_address_is_limited_across_accounts(self):
+        for i in range(5):
+            self.login("wrong", email=f"nobody{i}@example.com")
+
+        self.assertEqual(self.login("correct horse").status_code, 429)
+
+    def test_forged_forwarded_for_does_not_reset_address_limit(self):
+        for i in range(5):
+            self.client.post(
+                reverse("login"), {"email": f"nobody{i}@example.com", "password": "wrong"},
+                format="json", HTTP_X_FORWARDED_FOR=f"203.0.113.{i}",
+            )
+
+        response = self.client.post(
+            reverse("login"), {"email": "user@example.com", "password": "correct horse"},
+            format="json", HTTP_X_FORWARDED_FOR="203.0.113.99",
+        )
+        self.assertEqual(response.status_code, 429)
+
+    def test_address_appended_by_proxy_is_used(self):
+        with override_settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, "NUM_PROXIES": 1}):
+            for i in range(5):
+                self.client.defaults["HTTP_X_FORWARDED_FOR"] = f"203.0.113.{i}, 198.51.100.7"
+                self.login("wrong", email=f"nobody{i}@example.com")
+            blocked = self.login("correct horse")
+            self.client.defaults["HTTP_X_FORWARDED_FOR"] = "203.0.113.1, 198.51.100.8"
+            allowed = self.login("correct horse")
+
+        self.assertEqual(blocked.status_code, 429)
+        self.assertEqual(allowed.status_code, 200)
+
+    def test_success_clears_account_failures(self):
+        self.login("wrong")
+        self.login("wrong")
+        self.assertEqual(self.login("correct horse").status_code, 200)
+
+        ip_key, account_key = _failure_keys(RequestFactory().post("/"), "user@example.com")
+        self.assertIsNone(cache.get(account_key))
+        self.assertEqual(cache.get(ip_key), 2)
+
+
+class PasswordHasherTest(TestCase):
+    @override_settings(PASSWORD_PBKDF2_ITERATIONS=1000)
+    def test_iterations_come_from_settings(self):
+        user = User(email="user@example.com")
+        user.set_password("correct horse")
+        self.assertTrue(user.password.startswith("pbkdf2_sha256$1000$"))
+
+    def test_login_rehashes_with_preferred_hasher(self):
+        with override_settings(PASSWORD_PBKDF2_ITERATIONS=1000):
+            user = User.objects.create(email="user@example.com")
+            user.set_password("correct horse")
+            user.save()
+
+        with override_settings(PASSWORD_HASHERS=[
+            "user.hashers.Argon2PasswordHasher",
+            "user.hashers.PBKDF2PasswordHasher",
+        ], ARGON2_MEMORY_COST=1024):
+            response = APIClient().post(
+                reverse("login"), {"email": "user@example.com", "password": "correct horse"}, format="json"
+            )
+        self.assertEqual(response.status_code, 200)
+
+        user.refresh_from_db()
+        self.assertTrue(user.password.startswith("argon2$argon2id$v=19$m=1024,"))
+
+
+class TokenServiceTest(TestCase):
+    def test_tokens_match_simplejwt(self):
+        user = User.objects.create(email="user@example.com")
+        tokens = issue_tokens(user)
+
+        refresh = RefreshToken(tokens.refresh)
+        access = AccessToken(tokens.access)
+        self.assertEqual(refresh["user_id"], str(user.pk))
+        self.assertEqual(access["user_id"], str(user.pk))
+        self.assertNotEqual(refresh["jti"], access["jti"])
+        self.assertEqual(AccessToken(str(refresh.access_token))["user_id"], str(user.pk))
+
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens.access}")
+        self.assertEqual(client.get(reverse("profile")).data["email"], "user@example.com")
+
+    def test_serializer_issues_tokens_once(self):
+        user = User.objects.create(email="user@example.com")
+        serializer = UserRegisterSerializer(user)
+
+        with mock.patch("user.tokens.issue_tokens", wraps=issue_tokens) as issue:
+            first = serializer.to_representation(user)
+            second = serializer.to_representation(user)
+        self.assertEqual(issue.call_count, 1)
+        self.assertEqual(first["access"], second["access"])
@@ -0,0 +1,56 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.throttling import BaseThrottle, SimpleRateThrottle
+
+
+def _failure_keys(request, email):
+    keys = [f"login-failures:ip:{BaseThrottle().get_ident(request)}"]
+    if email:
+        digest = hashlib.sha1(str(email).strip().lower().encode()).hexdigest()
+        keys.append(f"login-failures:account:{digest}")
+    return keys
+
+
+def record_login_failure(request, email):
+    for key in _failure_keys(request, email):
+        cache.add(key, 0, settings.LOGIN_FAILURE_WINDOW)
+        try:
+            cache.incr(key)
+        except ValueError:
+            # Expired between add() and incr().
+            cache.set(key, 1, settings.LOGIN_FAILURE_WINDOW)
+
+
+def clear_login_failures(request, email):
+    # A successful login unlocks the account; the address keeps its count.
+    cache.delete_many(_failure_keys(request, email)[1:])
+
+
+class LoginFailureThrottle(BaseThrottle):
+    """
+    Rejects login attempts from an address or for an account with too many recent
+    failures. The check is a cache read, so a credential-stuffing burst is turned
+    away before any password is hashed.
+    """
+
+    def allow_request(self, request, view):
+        email = request.data.get("email") if hasattr(request.data, "get") else None
+        ip_key, *account_key = _failure_keys(request, email)
+        counts = cache.get_many([ip_key, *account_key])
+        if counts.get(ip_key, 0) >= settings.LOGIN_FAILURES_PER_IP:
+            return False
+        return not account_key or counts.get(account_key[0], 0) < settings.LOGIN_FAILURES_PER_ACCOUNT
+
+    def wait(self):
+        return settings.LOGIN_FAILURE_WINDOW
+
+
+class LoginRateThrottle(SimpleRateThrottle):
+    """Caps all login attempts per address at REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"]["login"]."""
+
+    scope = "login"
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {"scope": self.scope, "ident": self.get_ident(request)}
@@ -0,0 +1,25 @@
+from typing import NamedTuple
+
+from rest_framework_simplejwt.tokens import RefreshToken
+
+
+class TokenPair(NamedTuple):
+    refresh: str
+    access: str
+
+
+def issue_tokens(user):
+    """A signed refresh token for `user` and the access token derived from it."""
+    refresh = RefreshToken.for_user(user)
+    return TokenPair(refresh=str(refresh), access=str(refresh.access_token))
+
+
+class TokenIssuingMixin:
+    """Serializer mixin issuing a user's token pair once, however often it is rendered."""
+
+    _issued_tokens = None
+
+    def get_tokens(self, user):
+        if self._issued_tokens is None or self._issued_tokens[0] != user.pk:
+            self._issued_tokens = user.pk, issue_tokens(user)
+        return self._issued_tokens[1]
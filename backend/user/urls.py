@@ -1,7 +1,7 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 
-from . import views
+from . import async_views, views
 
 router = DefaultRouter()
 
@@ -10,5 +10,6 @@ router.register("register", views.UserRegisterViewSet, basename="register")
 urlpatterns = [
     path("login/", views.UserLoginView.as_view(), name="login"),
     path("profile/", views.UserProfileView.as_view(), name="profile"),
+    path("async/profile/", async_views.profile, name="async-profile"),
     path("", include(router.urls)),
 ]
\ No newline at end of file
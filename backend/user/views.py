@@ -1,14 +1,20 @@
+from functools import partial
+
 from rest_framework import status
 from rest_framework.viewsets import GenericViewSet
 from rest_framework.generics import GenericAPIView
 from rest_framework.mixins import CreateModelMixin
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.exceptions import ValidationError
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 
+from travel_planner.caching import ConditionalResponseMixin, profile_scope
+
 from .models import User
 from .serializers import UserRegisterSerializer, UserLoginSerializer, UserProfileSerializer
+from .throttling import LoginFailureThrottle, LoginRateThrottle, clear_login_failures, record_login_failure
 
 class UserRegisterViewSet(CreateModelMixin, GenericViewSet):
     permission_classes = [AllowAny]
@@ -31,6 +37,8 @@ class UserRegisterViewSet(CreateModelMixin, GenericViewSet):
 class UserLoginView(GenericAPIView):
     permission_classes = [AllowAny]
     serializer_class = UserLoginSerializer
+    # Both throttles only read the cache, so rejected attempts never reach the hasher.
+    throttle_classes = [LoginRateThrottle, LoginFailureThrottle]
 
     @swagger_auto_schema(
         operation_summary="Login User",
@@ -38,19 +46,29 @@ class UserLoginView(GenericAPIView):
         responses={
             200: UserLoginSerializer,
             401: "Unauthorized - Invalid or missing token",
+            429: "Too many attempts",
         },
         request_body=UserLoginSerializer,
         tags=["User"],
     )
     def post(self, request):
         serializer = self.get_serializer(data=request.data)
-        serializer.is_valid(raise_exception=True)
+        email = request.data.get("email")
+        try:
+            serializer.is_valid(raise_exception=True)
+        except ValidationError:
+            record_login_failure(request, email)
+            raise
+        clear_login_failures(request, email)
         return Response(serializer.user_tokens(), status=status.HTTP_200_OK)
 
-class UserProfileView(GenericAPIView):
+class UserProfileView(ConditionalResponseMixin, GenericAPIView):
     permission_classes = [IsAuthenticated]
     serializer_class = UserProfileSerializer
 
+    def get_cache_scope(self):
+        return profile_scope(self.request.user.pk)
+
     @swagger_auto_schema(
         operation_summary="User Profile",
         operation_description="User Profile",
@@ -71,5 +89,12 @@ class UserProfileView(GenericAPIView):
         ],
     )
     def get(self, request):
-        serializer = self.get_serializer(request.user)
+        return self.cached_response(request, partial(self._profile, request))
+
+    def _profile(self, request):
+        user = request.user
+        if not isinstance(user, User):
+            # Stateless tokens only carry the id, the profile needs the full row.
+            user = User.objects.get(pk=user.pk)
+        serializer = self.get_serializer(user)
         return Response(serializer.data, status=status.HTTP_200_OK)
\ No newline at end of file